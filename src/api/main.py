@@ -3,14 +3,17 @@ FastAPI web interface for K17 CTF Bot control panel
 Communicates with the bot via IPC to manage leaderboards
 """
 
-from fastapi import FastAPI, HTTPException, Depends, Cookie
+from fastapi import FastAPI, HTTPException, Depends, Cookie, Header, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from pydantic import BaseModel
 import sys
 import os
-from typing import Optional
+import json
+import asyncio
+import logging
+from typing import List, Optional, Set
 import secrets
 from datetime import datetime, timedelta
 
@@ -19,6 +22,8 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from shared.ipc import IPCClient
 from shared.database import DatabaseManager
+from shared.metrics import CONTENT_TYPE, REGISTRY, merge_families, render
+from shared.profiler import MAX_PROFILE_SECONDS, MAX_SAMPLE_INTERVAL, MIN_SAMPLE_INTERVAL, MIN_SLOW_CALLBACK_MS, MODES
 
 app = FastAPI(title="K17 CTF Bot Control Panel")
 
@@ -31,6 +36,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+logger = logging.getLogger(__name__)
+
 # Database connection
 db = DatabaseManager()
 
@@ -38,6 +45,9 @@ db = DatabaseManager()
 WEB_USERNAME = os.getenv('WEB_USERNAME', 'admin')
 WEB_PASSWORD = os.getenv('WEB_PASSWORD', 'changeme')
 
+# Bearer token for /metrics scrapers; unset leaves the endpoint open (keep it off public networks)
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
 # Session storage (in-memory, will reset on restart)
 active_sessions = {}  # {session_token: expiry_time}
 
@@ -82,19 +92,89 @@ class CreateMessageRequest(BaseModel):
     ctfd_domain: Optional[str] = None
     ctfd_api_key: Optional[str] = None
     forum_channel_id: Optional[str] = None
+    team_name: Optional[str] = None  # Team to track; defaults to K17
+    team_id: Optional[int] = None  # CTFd team ID, enables team-scoped API queries
+    poll_interval: Optional[int] = None  # Base refresh interval in seconds
+    ctf_start: Optional[str] = None  # ISO 8601, used to adapt refresh rate
+    ctf_end: Optional[str] = None
 
 class LoginRequest(BaseModel):
     username: str
     password: str
 
+class EventHub:
+    """Holds a single IPC event subscription to the bot and fans events out to every open dashboard"""
+    
+    QUEUE_SIZE = 256
+    RECONNECT_DELAY = 5
+    
+    def __init__(self):
+        self.queues: Set[asyncio.Queue] = set()
+        self.bot_online = False
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+    
+    def register(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.QUEUE_SIZE)
+        self.queues.add(queue)
+        return queue
+    
+    def unregister(self, queue: asyncio.Queue):
+        self.queues.discard(queue)
+    
+    def publish(self, event: dict):
+        for queue in self.queues:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # The dashboard fell behind; tell it to reload the cache instead of replaying deltas
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"type": "resync"})
+    
+    def _set_online(self, online: bool):
+        if online != self.bot_online:
+            self.bot_online = online
+            self.publish({"type": "bot_status", "online": online})
+    
+    async def _run(self):
+        while True:
+            try:
+                stream = IPCClient.subscribe()
+                async for event in stream:
+                    self._set_online(True)
+                    if event.get("type") != "subscribed":
+                        self.publish(event)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.debug(f"Bot event stream unavailable: {e}")
+            self._set_online(False)
+            await asyncio.sleep(self.RECONNECT_DELAY)
+
+event_hub = EventHub()
+
 @app.on_event("startup")
 async def startup():
-    """Initialize database connection"""
+    """Initialize database connection and bot event subscription"""
     await db.connect()
+    event_hub.start()
 
 @app.on_event("shutdown")
 async def shutdown():
-    """Close database connection"""
+    """Close database and IPC connections"""
+    await event_hub.stop()
+    await IPCClient.close()
     await db.close()
 
 # API Endpoints
@@ -137,10 +217,114 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "ok"}
 
+@app.get("/metrics")
+async def metrics(authorization: Optional[str] = Header(None)):
+    """Prometheus text exposition of the bot's and the API's metrics"""
+    if METRICS_TOKEN and not secrets.compare_digest(authorization or "", f"Bearer {METRICS_TOKEN}"):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    
+    response = await IPCClient.send_request("get_metrics")
+    # Still serve the API's own metrics while the bot is down; k17_bot_up tells scrapers which it is
+    bot_up = response.get("status") == "success"
+    bot_families = response.get("data", []) if bot_up else []
+    up = [{"name": "k17_bot_up", "type": "gauge", "help": "Whether the bot answered the metrics request",
+           "samples": [["k17_bot_up", {}, 1 if bot_up else 0]]}]
+    families = merge_families(up, bot_families, REGISTRY.collect({"process": "api"}))
+    return Response(content=render(families), media_type=CONTENT_TYPE)
+
+def _parse_etag_version(if_none_match: Optional[str]) -> Optional[int]:
+    """Extract the cache version from an If-None-Match header such as "123" or W/"123" """
+    if not if_none_match:
+        return None
+    tag = if_none_match.split(",")[0].strip().removeprefix("W/").strip('"')
+    return int(tag) if tag.isdigit() else None
+
 @app.get("/api/cache")
-async def get_cache(authenticated: bool = Depends(require_auth)):
-    """Get the entire cache from the bot"""
-    response = await IPCClient.send_request("get_cache")
+async def get_cache(
+    since: Optional[int] = None,
+    if_none_match: Optional[str] = Header(None),
+    authenticated: bool = Depends(require_auth)
+):
+    """Get the cache from the bot: 304 if unchanged, a delta with ?since=<version>, otherwise everything"""
+    response = await IPCClient.send_request(
+        "get_cache",
+        if_version=_parse_etag_version(if_none_match),
+        since=since
+    )
+    if response.get("status") == "error":
+        raise HTTPException(status_code=500, detail=response.get("message"))
+    
+    etag = f'"{response.get("version")}"'
+    if response.get("status") == "not_modified":
+        return Response(status_code=304, headers={"ETag": etag})
+    return JSONResponse(response, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+@app.get("/api/events")
+async def stream_events(authenticated: bool = Depends(require_auth)):
+    """Server-Sent Events stream of bot status and cache change events"""
+    queue = event_hub.register()
+    
+    async def stream():
+        try:
+            yield f"data: {json.dumps({'type': 'bot_status', 'online': event_hub.bot_online})}\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"data: {json.dumps(event)}\n\n"
+        finally:
+            event_hub.unregister(queue)
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/api/stats")
+async def get_stats(authenticated: bool = Depends(require_auth)):
+    """Get bot runtime statistics (Discord edits performed vs skipped)"""
+    response = await IPCClient.send_request("get_stats")
+    if response.get("status") == "error":
+        raise HTTPException(status_code=500, detail=response.get("message"))
+    return response
+
+@app.post("/api/profile")
+async def profile_bot(
+    seconds: float = 10,
+    mode: str = "sample",
+    interval: float = 0.005,
+    slow_callback_ms: float = 100,
+    limit: int = 50,
+    raw: bool = False,
+    authenticated: bool = Depends(require_auth)
+):
+    """Profile the bot's event loop for `seconds`: collapsed stacks (mode=sample) or
+    pstats output (mode=cprofile, raw=true adds the marshalled stats), plus slow callbacks"""
+    if not 0 < seconds <= MAX_PROFILE_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds must be between 0 and {MAX_PROFILE_SECONDS}")
+    if not MIN_SAMPLE_INTERVAL <= interval <= MAX_SAMPLE_INTERVAL:
+        raise HTTPException(
+            status_code=400, detail=f"interval must be between {MIN_SAMPLE_INTERVAL} and {MAX_SAMPLE_INTERVAL}"
+        )
+    if not slow_callback_ms >= MIN_SLOW_CALLBACK_MS:
+        raise HTTPException(status_code=400, detail=f"slow_callback_ms must be at least {MIN_SLOW_CALLBACK_MS}")
+    if mode not in MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {', '.join(MODES)}")
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be at least 1")
+    response = await IPCClient.send_request(
+        "profile",
+        timeout=seconds + IPCClient.REQUEST_TIMEOUT,
+        seconds=seconds,
+        mode=mode,
+        interval=interval,
+        slow_callback_ms=slow_callback_ms,
+        limit=limit,
+        raw=raw
+    )
     if response.get("status") == "error":
         raise HTTPException(status_code=500, detail=response.get("message"))
     return response
@@ -174,9 +358,9 @@ async def trigger_update(authenticated: bool = Depends(require_auth)):
     return response
 
 @app.post("/api/reload-cache")
-async def reload_cache(authenticated: bool = Depends(require_auth)):
-    """Reload cache from database"""
-    response = await IPCClient.send_request("reload_cache")
+async def reload_cache(full: bool = False, authenticated: bool = Depends(require_auth)):
+    """Sync the cache with rows changed in the database; `?full=true` re-reads every row"""
+    response = await IPCClient.send_request("reload_cache", full=full)
     if response.get("status") == "error":
         raise HTTPException(status_code=500, detail=response.get("message"))
     return response
@@ -191,7 +375,12 @@ async def create_message(request: CreateMessageRequest, authenticated: bool = De
         initial_counter=request.initial_counter,
         ctfd_domain=request.ctfd_domain,
         ctfd_api_key=request.ctfd_api_key,
-        forum_channel_id=int(request.forum_channel_id) if request.forum_channel_id else 0
+        forum_channel_id=int(request.forum_channel_id) if request.forum_channel_id else 0,
+        team_name=request.team_name,
+        team_id=request.team_id or 0,
+        poll_interval=request.poll_interval or 0,
+        ctf_start=request.ctf_start,
+        ctf_end=request.ctf_end
     )
     if response.get("status") == "error":
         raise HTTPException(status_code=500, detail=response.get("message"))
@@ -209,14 +398,74 @@ async def get_tracked_messages(authenticated: bool = Depends(require_auth)):
         "data": [dict(msg) for msg in messages]
     }
 
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Comma-separated ?fields= projection; None selects every column"""
+    if not fields:
+        return None
+    return [field.strip() for field in fields.split(",") if field.strip()]
+
+@app.get("/api/tracked-messages/page")
+async def get_tracked_messages_page(
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = "message_id,channel_id,guild_id,message_type,created_at",
+    guild_id: Optional[int] = None,
+    authenticated: bool = Depends(require_auth)
+):
+    """Page through tracked messages newest first; pass next_cursor back as ?cursor=
+    
+    Leaves metadata out unless it is listed in ?fields=.
+    """
+    try:
+        messages, next_cursor = await db.get_tracked_messages_page(
+            feature_type="ctf_leaderboard",
+            guild_id=guild_id,
+            is_active=True,
+            limit=limit,
+            cursor=cursor,
+            columns=_parse_fields(fields)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "status": "success",
+        "data": [dict(msg) for msg in messages],
+        "next_cursor": next_cursor
+    }
+
+@app.get("/api/audit-logs")
+async def get_audit_logs(
+    guild_id: int,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    action_type: Optional[str] = None,
+    fields: Optional[str] = None,
+    authenticated: bool = Depends(require_auth)
+):
+    """Page through a guild's audit log newest first; pass next_cursor back as ?cursor="""
+    try:
+        logs, next_cursor = await db.get_audit_logs_page(
+            guild_id,
+            limit=limit,
+            cursor=cursor,
+            action_type=action_type,
+            columns=_parse_fields(fields)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "status": "success",
+        "data": [dict(log) for log in logs],
+        "next_cursor": next_cursor
+    }
+
 @app.get("/api/tracked-messages/{message_id}")
 async def get_tracked_message(message_id: int):
     """Get a specific tracked message from database"""
-    messages = await db.get_tracked_messages(is_active=True)
-    for msg in messages:
-        if msg['message_id'] == message_id:
-            return {"status": "success", "data": dict(msg)}
-    raise HTTPException(status_code=404, detail="Message not found")
+    msg = await db.get_tracked_message(message_id)
+    if msg is None or not msg['is_active']:
+        raise HTTPException(status_code=404, detail="Message not found")
+    return {"status": "success", "data": dict(msg)}
 
 class DeleteMessageRequest(BaseModel):
     message_id: str  # String to preserve large integer precision
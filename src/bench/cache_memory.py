@@ -0,0 +1,139 @@
+"""
+Memory and lookup benchmark for the tracked message cache.
+Compares the old nested-dict cache with MessageCache at increasing sizes.
+
+Usage: python3 src/bench/cache_memory.py [--sizes 10000,50000,100000] [--guilds 50]
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bot'))
+
+from utils.message_cache import MessageCache, TrackedMessage
+
+
+def make_rows(count: int, guilds: int):
+    """Synthetic tracked_messages rows, mixing counters and CTFd trackers"""
+    rng = random.Random(17)
+    rows = []
+    for i in range(count):
+        guild_id = 10**17 + rng.randrange(guilds)
+        channel_id = 2 * 10**17 + rng.randrange(guilds * 20)
+        if i % 4 == 0:
+            message_type, metadata = 'counter', {"counter": rng.randrange(10_000)}
+        else:
+            message_type = 'ctfd_tracker'
+            metadata = {
+                "ctfd_domain": f"https://ctf{rng.randrange(20)}.example.com",
+                "api_key": f"ctfd_{rng.getrandbits(128):032x}",
+                "forum_channel_id": 3 * 10**17 + rng.randrange(guilds),
+                "team_name": "K17",
+                "poll_interval": 60,
+                "ctf_end": "2026-11-01T00:00:00+00:00"
+            }
+        rows.append({
+            'message_id': 10**18 + i, 'channel_id': channel_id, 'guild_id': guild_id,
+            'message_type': message_type, 'metadata': metadata
+        })
+    return rows
+
+
+def build_legacy(rows):
+    # What CTFLeaderboardManager.initialize used to build
+    return {
+        row['message_id']: {
+            'channel_id': row['channel_id'],
+            'guild_id': row['guild_id'],
+            'message_type': row['message_type'],
+            'metadata': dict(row['metadata'])
+        }
+        for row in rows
+    }
+
+
+def build_slotted(rows):
+    cache = MessageCache()
+    for row in rows:
+        cache.add(TrackedMessage.from_record(row))
+    return cache
+
+
+def build_records(rows):
+    # Slotted records alone, to separate their footprint from the secondary indexes
+    return {row['message_id']: TrackedMessage.from_record(row) for row in rows}
+
+
+def measure(build, rows):
+    """Return (cache, bytes allocated, seconds to build)"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    cache = build(rows)
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cache, size, elapsed
+
+
+def timed(fn, repeat: int) -> float:
+    """Mean seconds per call"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='10000,50000,100000')
+    parser.add_argument('--guilds', type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'entries':>8} {'cache':>8} {'memory':>10} {'B/entry':>8} {'build':>9} "
+          f"{'by id':>9} {'by guild':>10} {'by channel':>11} {'json':>10}")
+    for count in (int(size) for size in args.sizes.split(',')):
+        rows = make_rows(count, args.guilds)
+        ids = [row['message_id'] for row in random.Random(1).sample(rows, min(1000, count))]
+        guild_id, channel_id = rows[0]['guild_id'], rows[0]['channel_id']
+
+        legacy, legacy_size, legacy_build = measure(build_legacy, rows)
+        legacy_times = (
+            timed(lambda: [legacy.get(i) for i in ids], 20) / len(ids),
+            timed(lambda: [v for v in legacy.values() if v['guild_id'] == guild_id], 5),
+            timed(lambda: [v for v in legacy.values() if v['channel_id'] == channel_id], 5),
+            timed(lambda: json.dumps({str(k): v for k, v in legacy.items()}), 3),
+        )
+        del legacy
+
+        slotted, slotted_size, slotted_build = measure(build_slotted, rows)
+        slotted_times = (
+            timed(lambda: [slotted.get(i) for i in ids], 20) / len(ids),
+            timed(lambda: slotted.in_guild(guild_id), 5),
+            timed(lambda: slotted.in_channel(channel_id), 5),
+            timed(lambda: json.dumps({str(m.message_id): m.to_dict() for m in slotted.values()}), 3),
+        )
+        del slotted
+
+        _, records_size, records_build = measure(build_records, rows)
+
+        for name, size, build, times in (("dict", legacy_size, legacy_build, legacy_times),
+                                         ("slotted", slotted_size, slotted_build, slotted_times),
+                                         ("records", records_size, records_build, None)):
+            if times is None:
+                print(f"{count:>8} {name:>8} {size / 2**20:>8.1f}MB {size / count:>8.0f} {build * 1e3:>7.1f}ms")
+                continue
+            lookup, guild, channel, serialize = times
+            print(f"{count:>8} {name:>8} {size / 2**20:>8.1f}MB {size / count:>8.0f} {build * 1e3:>7.1f}ms "
+                  f"{lookup * 1e9:>7.0f}ns {guild * 1e6:>8.0f}us {channel * 1e6:>9.0f}us "
+                  f"{serialize * 1e3:>8.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""
+Fake CTFd API server for offline benchmarks.
+Serves generated scoreboards, challenge lists and team endpoints for one or more CTFs
+(mounted at /ctf<N>/) with configurable size, latency and failure rate. Runs its own event
+loop in a background thread so serving cost doesn't show up in the bot's tick latency.
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+import threading
+from typing import Dict, Optional
+
+from aiohttp import web
+
+TEAM_NAME = "K17"
+TEAM_ID = 17
+
+
+class _CTF:
+    """Generated state of one fake CTF; bodies are re-encoded only when it changes"""
+
+    def __init__(self, teams: int, challenges: int, team_rank: int, rng: random.Random):
+        self.rng = rng
+        self.team_count = teams
+        self.challenges = [
+            {"id": i, "name": f"challenge-{i}", "category": rng.choice(["web", "pwn", "crypto", "rev", "misc"]),
+             "value": 100 + 50 * (i % 10), "type": "standard", "tags": [], "template": "/plugin/view.html",
+             "script": "/plugin/view.js"}
+            for i in range(challenges)
+        ]
+        self.solved = set(rng.sample(range(challenges), min(challenges // 4, challenges)))
+        self.team_rank = min(team_rank, teams)
+        self.version = 0
+        self.bodies: Dict[str, bytes] = {}
+        self._encode()
+
+    def advance(self, solve_rate: float):
+        """Move the CTF along: new solves for the team and reshuffled standings"""
+        changed = False
+        for challenge in self.challenges:
+            if challenge["id"] not in self.solved and self.rng.random() < solve_rate:
+                self.solved.add(challenge["id"])
+                changed = True
+        if self.rng.random() < solve_rate * 4:
+            self.team_rank = max(1, min(self.team_count, self.team_rank + self.rng.choice((-1, 1))))
+            changed = True
+        if changed:
+            self.version += 1
+            self._encode()
+
+    def _encode(self):
+        scoreboard = []
+        for pos in range(1, self.team_count + 1):
+            ours = pos == self.team_rank
+            scoreboard.append({
+                "pos": pos, "account_id": TEAM_ID if ours else 1000 + pos,
+                "account_url": f"/teams/{pos}", "account_type": "team", "oauth_id": None,
+                "name": TEAM_NAME if ours else f"team-{pos}",
+                "score": 10_000 - pos, "members": [
+                    {"id": pos * 10 + m, "name": f"member-{pos}-{m}", "score": 100, "oauth_id": None}
+                    for m in range(4)
+                ]
+            })
+        challenges = [dict(challenge, solves=0, solved_by_me=challenge["id"] in self.solved)
+                      for challenge in self.challenges]
+        solves = [{"challenge_id": i, "challenge": {"name": self.challenges[i]["name"],
+                                                    "category": self.challenges[i]["category"]}}
+                  for i in sorted(self.solved)]
+        team = {"id": TEAM_ID, "name": TEAM_NAME, "place": _ordinal(self.team_rank), "score": 5000}
+
+        bodies = {}
+        for endpoint, data in (("scoreboard", scoreboard), ("challenges", challenges),
+                               ("team", team), ("solves", solves)):
+            bodies[endpoint] = json.dumps({"success": True, "data": data}).encode()
+        self.bodies = bodies  # Swapped in one assignment; the server thread may be reading
+
+
+def _ordinal(n: int) -> str:
+    suffix = "th" if 10 <= n % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
+    return f"{n}{suffix}"
+
+
+class FakeCTFd:
+    """Local HTTP server imitating the CTFd endpoints trackers use"""
+
+    def __init__(self, domains: int = 1, teams: int = 1000, challenges: int = 200, team_rank: int = 10,
+                 latency: float = 0.0, jitter: float = 0.0, failure_rate: float = 0.0, seed: int = 17):
+        rng = random.Random(seed)
+        self.ctfs = [_CTF(teams, challenges, team_rank, rng) for _ in range(domains)]
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed + 1)
+        self.stats = {"requests": 0, "bytes_sent": 0, "not_modified": 0, "failures": 0}
+
+        self.base_url: Optional[str] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def domain(self, index: int) -> str:
+        return f"{self.base_url}/ctf{index}/"
+
+    def advance(self, solve_rate: float = 0.02):
+        for ctf in self.ctfs:
+            ctf.advance(solve_rate)
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        self.stats['requests'] += 1
+        if self.latency or self.jitter:
+            await asyncio.sleep(max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter)))
+        if self._rng.random() < self.failure_rate:
+            self.stats['failures'] += 1
+            return web.Response(status=500, text="Internal Server Error")
+
+        index = int(request.match_info["ctf"])
+        if index >= len(self.ctfs):
+            return web.Response(status=404)
+        ctf = self.ctfs[index]
+        path = request.match_info["path"].rstrip("/")
+        if path == "scoreboard":
+            key = "scoreboard"
+        elif path == "challenges":
+            key = "challenges"
+        elif path in ("teams/me", f"teams/{TEAM_ID}"):
+            key = "team"
+        elif path in ("teams/me/solves", f"teams/{TEAM_ID}/solves"):
+            key = "solves"
+        else:
+            return web.Response(status=404)
+
+        body = ctf.bodies[key]
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if request.headers.get("If-None-Match") == etag:
+            self.stats['not_modified'] += 1
+            return web.Response(status=304, headers={"ETag": etag})
+        self.stats['bytes_sent'] += len(body)
+        return web.Response(body=body, content_type="application/json", headers={"ETag": etag})
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving in a background thread; returns the base URL"""
+        ready = threading.Event()
+
+        def serve():
+            self._loop = asyncio.new_event_loop()
+            app = web.Application()
+            app.router.add_get(r"/ctf{ctf:\d+}/api/v1/{path:.+}", self._handle)
+            self._runner = web.AppRunner(app, access_log=None)
+            self._loop.run_until_complete(self._runner.setup())
+            site = web.TCPSite(self._runner, host, port)
+            self._loop.run_until_complete(site.start())
+            bound_port = self._runner.addresses[0][1]
+            self.base_url = f"http://{host}:{bound_port}"
+            ready.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self._runner.cleanup())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=serve, name="fake-ctfd", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self.base_url  # type: ignore
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
@@ -0,0 +1,154 @@
+"""
+Discord and database stand-ins for offline benchmarks.
+The stub channel is a real discord.TextChannel subclass so the manager's isinstance checks
+pass, but edits and sends only sleep for a simulated latency and get counted.
+"""
+
+import asyncio
+import itertools
+import json
+import time
+from collections import Counter
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+import discord
+
+
+class EditRecorder:
+    """Counts Discord calls made through the stubs"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = Counter()
+        self.latencies: List[float] = []
+
+    async def record(self, kind: str):
+        start = time.perf_counter()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.calls[kind] += 1
+        self.latencies.append(time.perf_counter() - start)
+
+
+class StubMessage:
+    def __init__(self, message_id: int, recorder: EditRecorder, content: str = ""):
+        self.id = message_id
+        self.content = content
+        self._recorder = recorder
+
+    async def edit(self, content: Optional[str] = None, **kwargs):
+        await self._recorder.record("edit")
+        self.content = content or ""
+        return self
+
+    async def delete(self):
+        await self._recorder.record("delete")
+
+
+class StubChannel(discord.TextChannel):
+    """TextChannel that never touches the gateway"""
+
+    def __init__(self, channel_id: int, guild_id: int, recorder: EditRecorder):
+        self.id = channel_id
+        self.guild = SimpleNamespace(id=guild_id)  # type: ignore
+        self._recorder = recorder
+        self._ids = itertools.count(channel_id * 1000)
+
+    def get_partial_message(self, message_id: int) -> StubMessage:  # type: ignore
+        return StubMessage(message_id, self._recorder)
+
+    async def send(self, content: Optional[str] = None, **kwargs) -> StubMessage:  # type: ignore
+        await self._recorder.record("send")
+        return StubMessage(next(self._ids), self._recorder, content or "")
+
+
+class StubBot:
+    """Just enough of K17Bot for CTFLeaderboardManager"""
+
+    def __init__(self, recorder: EditRecorder):
+        self.recorder = recorder
+        self.channels: Dict[int, StubChannel] = {}
+
+    def add_channel(self, channel_id: int, guild_id: int) -> StubChannel:
+        channel = self.channels[channel_id] = StubChannel(channel_id, guild_id, self.recorder)
+        return channel
+
+    def get_channel(self, channel_id: int):
+        return self.channels.get(channel_id)
+
+    async def wait_until_ready(self):
+        return None
+
+
+class StubDatabase:
+    """In-memory tracked_messages table counting the queries issued against it"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.rows: Dict[int, Dict[str, Any]] = {}
+        self.queries = Counter()
+
+    async def _query(self, name: str):
+        self.queries[name] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    def _store(self, message_id, channel_id, guild_id, feature_type, message_type, metadata):
+        now = datetime.now()
+        previous = self.rows.get(message_id)
+        self.rows[message_id] = {
+            'message_id': message_id, 'channel_id': channel_id, 'guild_id': guild_id,
+            'feature_type': feature_type, 'message_type': message_type,
+            'metadata': json.dumps(metadata) if metadata else None, 'is_active': True,
+            'created_at': previous['created_at'] if previous else now, 'updated_at': now
+        }
+
+    def seed(self, message_id: int, channel_id: int, guild_id: int, message_type: str, metadata: dict):
+        """Insert a row without counting it as a query"""
+        self._store(message_id, channel_id, guild_id, "ctf_leaderboard", message_type, metadata)
+
+    async def add_tracked_message(self, message_id, channel_id, guild_id, feature_type,
+                                  message_type='counter', metadata=None):
+        await self._query("add_tracked_message")
+        self._store(message_id, channel_id, guild_id, feature_type, message_type, metadata)
+        return len(self.rows)
+
+    async def get_tracked_messages(self, feature_type=None, guild_id=None, is_active=True):
+        await self._query("get_tracked_messages")
+        return [dict(row) for row in self.rows.values()
+                if row['is_active'] == is_active
+                and (feature_type is None or row['feature_type'] == feature_type)
+                and (guild_id is None or row['guild_id'] == guild_id)]
+
+    async def get_tracked_messages_changed_since(self, feature_type, since=None):
+        await self._query("get_tracked_messages_changed_since")
+        rows = [dict(row) for row in self.rows.values()
+                if row['feature_type'] == feature_type and (since is None or row['updated_at'] >= since)]
+        return sorted(rows, key=lambda row: row['updated_at'])
+
+    async def bulk_update_tracked_message_metadata(self, updates):
+        await self._query("bulk_update_tracked_message_metadata")
+        now = datetime.now()
+        result = {}
+        for message_id, metadata in updates.items():
+            row = self.rows.get(message_id)
+            result[message_id] = row is not None
+            if row is not None:
+                row['metadata'] = json.dumps(metadata)
+                row['updated_at'] = now
+        return result
+
+    async def deactivate_tracked_message(self, message_id):
+        await self._query("deactivate_tracked_message")
+        if message_id in self.rows:
+            self.rows[message_id].update(is_active=False, updated_at=datetime.now())
+
+    async def delete_tracked_message(self, message_id):
+        await self._query("delete_tracked_message")
+        self.rows.pop(message_id, None)
+
+    @property
+    def query_count(self) -> int:
+        return sum(self.queries.values())
@@ -0,0 +1,212 @@
+"""
+Offline tick benchmark for the CTFd tracker pipeline.
+Drives CTFLeaderboardManager.update_leaderboards against a fake CTFd server, stub Discord
+channels and a stub database, then measures the IPC path over a temporary socket.
+
+Usage: python3 src/bench/tick_benchmark.py [--trackers 200] [--ticks 10] [--mode full] [--json]
+Run with --help for every knob (payload size, latency, failures, edit budget, ...).
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bot'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from fake_ctfd import FakeCTFd, TEAM_ID, TEAM_NAME
+from stubs import EditRecorder, StubBot, StubDatabase
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {"p50": pick(0.50), "p90": pick(0.90), "p99": pick(0.99), "max": ordered[-1]}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--trackers', type=int, default=200, help="CTFd trackers to refresh per tick")
+    parser.add_argument('--counters', type=int, default=0, help="counter messages refreshed alongside")
+    parser.add_argument('--channels', type=int, default=20)
+    parser.add_argument('--domains', type=int, default=2, help="distinct fake CTFs")
+    parser.add_argument('--mode', choices=('full', 'scoped'), default='full',
+                        help="full: scoreboard scan; scoped: teams/me with an API key")
+    parser.add_argument('--teams', type=int, default=2000, help="scoreboard size")
+    parser.add_argument('--challenges', type=int, default=300)
+    parser.add_argument('--team-rank', type=int, default=50, help="our team's scoreboard position")
+    parser.add_argument('--ctfd-latency', type=float, default=0.05, help="seconds per CTFd response")
+    parser.add_argument('--ctfd-jitter', type=float, default=0.02)
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="fraction of CTFd requests returning 500")
+    parser.add_argument('--solve-rate', type=float, default=0.01, help="per-challenge solve chance per tick")
+    parser.add_argument('--edit-latency', type=float, default=0.05, help="seconds per Discord edit")
+    parser.add_argument('--edit-rate', type=int, default=5, help="Discord edits per channel per --edit-per")
+    parser.add_argument('--edit-per', type=float, default=5.0)
+    parser.add_argument('--db-latency', type=float, default=0.002)
+    parser.add_argument('--cache-ttl', type=float, default=0.0,
+                        help="CTFd client cache TTL; 0 makes every tick revalidate, like real 60 s ticks")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--render-pool', choices=('inline', 'thread', 'process'), default='thread')
+    parser.add_argument('--ticks', type=int, default=10)
+    parser.add_argument('--ipc-requests', type=int, default=200)
+    parser.add_argument('--json', action='store_true', help="print the report as JSON")
+    return parser.parse_args()
+
+
+async def run_ticks(args, fake: FakeCTFd):
+    from features import CTFLeaderboardManager
+    from utils.ctfd_client import CTFdClient
+    from utils.render import RenderPool
+
+    recorder = EditRecorder(args.edit_latency)
+    bot = StubBot(recorder)
+    db = StubDatabase(args.db_latency)
+
+    guild_id = 1
+    channels = [bot.add_channel(10_000 + i, guild_id) for i in range(args.channels)]
+    message_id = 10**6
+    for i in range(args.trackers):
+        metadata = {"ctfd_domain": fake.domain(i % args.domains), "team_name": TEAM_NAME}
+        if args.mode == 'scoped':
+            metadata.update(api_key=f"ctfd_bench_{i % args.domains}", team_id=TEAM_ID)
+        db.seed(message_id, channels[i % args.channels].id, guild_id, 'ctfd_tracker', metadata)
+        message_id += 1
+    for i in range(args.counters):
+        db.seed(message_id, channels[i % args.channels].id, guild_id, 'counter', {"counter": 0})
+        message_id += 1
+
+    ctfd = CTFdClient(cache_ttl=args.cache_ttl)
+    pool = RenderPool(2, args.render_pool)
+    manager = CTFLeaderboardManager(
+        bot, db, ctfd, max_concurrency=args.concurrency,
+        edit_rate=args.edit_rate, edit_per=args.edit_per, render_pool=pool
+    )
+    await manager.initialize()
+
+    ticks = []
+    for tick in range(args.ticks):
+        fake.advance(args.solve_rate)
+        ctfd_bytes, ctfd_requests = ctfd.cache_stats['bytes_read'], fake.stats['requests']
+        edits, queries = recorder.calls['edit'], db.query_count
+
+        start = time.perf_counter()
+        await manager.update_leaderboards()
+        await manager.write_buffer.flush()
+        elapsed = time.perf_counter() - start
+
+        ticks.append({
+            "tick": tick,
+            "seconds": elapsed,
+            "ctfd_requests": fake.stats['requests'] - ctfd_requests,
+            "ctfd_bytes": ctfd.cache_stats['bytes_read'] - ctfd_bytes,  # Read by the bot, not sent
+            "edits": recorder.calls['edit'] - edits,
+            "db_queries": db.query_count - queries
+        })
+
+    ipc = await run_ipc(args, manager) if args.ipc_requests else {}
+
+    summary = {
+        "edit_stats": manager.get_edit_stats(),
+        "edit_queue": manager.edits.get_stats(),
+        "ctfd_cache": dict(ctfd.cache_stats),
+        "db_queries_by_method": dict(db.queries),
+        "edit_latency": percentiles(recorder.latencies)
+    }
+    await ctfd.close()
+    pool.close()
+    return ticks, ipc, summary
+
+
+async def run_ipc(args, manager) -> dict:
+    """Round-trip latency of the IPC calls the web API makes most"""
+    # Keep clear of a running bot's socket
+    os.environ["IPC_SOCKET_PATH"] = os.path.join(tempfile.mkdtemp(prefix="k17-bench-"), "bench.sock")
+    from shared import ipc
+
+    server = ipc.IPCServer(manager)
+    await server.start()
+
+    results = {}
+    try:
+        version = manager.cache_version
+        for name, kwargs in (("get_cache", {}), ("get_cache_delta", {"since": version}),
+                             ("get_cache_not_modified", {"if_version": version}), ("get_stats", {})):
+            action = "get_stats" if name == "get_stats" else "get_cache"
+            samples = []
+            for _ in range(args.ipc_requests):
+                start = time.perf_counter()
+                response = await ipc.IPCClient.send_request(action, **kwargs)
+                samples.append(time.perf_counter() - start)
+                if response.get("status") == "error":
+                    raise RuntimeError(f"IPC {name} failed: {response.get('message')}")
+            results[name] = percentiles(samples)
+    finally:
+        await ipc.IPCClient.close()
+        await server.stop()
+    return results
+
+
+def report(args, ticks, ipc, summary, fake: FakeCTFd):
+    seconds = [t["seconds"] for t in ticks]
+    per_tick = {key: sum(t[key] for t in ticks) / len(ticks)
+                for key in ("ctfd_requests", "ctfd_bytes", "edits", "db_queries")}
+    result = {
+        "config": vars(args),
+        "tick_latency": percentiles(seconds),
+        "per_tick": per_tick,
+        "ticks": ticks,
+        "ipc": ipc,
+        "fake_ctfd": dict(fake.stats),
+        **summary
+    }
+    if args.json:
+        print(json.dumps(result, indent=2, default=str))
+        return
+
+    print(f"{args.trackers} trackers + {args.counters} counters, {args.channels} channels, "
+          f"{args.domains} CTFs ({args.mode} mode, {args.teams} teams, {args.challenges} challenges)")
+    print("\nTick latency:  " + "  ".join(f"{k} {v * 1e3:.1f}ms" for k, v in result["tick_latency"].items()))
+    print(f"Per tick:      {per_tick['ctfd_requests']:.1f} CTFd requests, "
+          f"{per_tick['ctfd_bytes'] / 1024:.1f} KiB from CTFd, {per_tick['edits']:.1f} edits, "
+          f"{per_tick['db_queries']:.1f} DB queries")
+    print(f"\n{'tick':>4} {'ms':>9} {'requests':>9} {'KiB':>9} {'edits':>6} {'queries':>8}")
+    for t in ticks:
+        print(f"{t['tick']:>4} {t['seconds'] * 1e3:>9.1f} {t['ctfd_requests']:>9} "
+              f"{t['ctfd_bytes'] / 1024:>9.1f} {t['edits']:>6} {t['db_queries']:>8}")
+    if ipc:
+        print("\nIPC round trips:")
+        for name, stats in ipc.items():
+            print(f"  {name:<24}" + "  ".join(f"{k} {v * 1e3:.2f}ms" for k, v in stats.items()))
+    print(f"\nEdits: {summary['edit_stats']}  queue: {summary['edit_queue']}")
+    print(f"CTFd client cache: {summary['ctfd_cache']}")
+    print(f"Fake CTFd: {result['fake_ctfd']}")
+    print(f"DB queries: {summary['db_queries_by_method']}")
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    fake = FakeCTFd(args.domains, args.teams, args.challenges, args.team_rank,
+                    args.ctfd_latency, args.ctfd_jitter, args.failure_rate)
+    fake.start()
+    try:
+        ticks, ipc, summary = asyncio.run(run_ticks(args, fake))
+    finally:
+        fake.stop()
+    report(args, ticks, ipc, summary, fake)
+
+
+if __name__ == '__main__':
+    main()
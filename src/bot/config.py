@@ -4,3 +4,38 @@ DISCORD_TOKEN = os.getenv('DISCORD_TOKEN')
 
 if DISCORD_TOKEN is None:
     raise ValueError("DISCORD_TOKEN environment variable not set")
+
+# CTFd client settings (seconds)
+CTFD_REQUEST_TIMEOUT = float(os.getenv('CTFD_REQUEST_TIMEOUT', 10))
+CTFD_CONNECT_TIMEOUT = float(os.getenv('CTFD_CONNECT_TIMEOUT', 5))
+
+# Shared CTFd response cache (TTL in seconds, max number of cached responses)
+CTFD_CACHE_TTL = float(os.getenv('CTFD_CACHE_TTL', 30))
+CTFD_CACHE_MAX_ENTRIES = int(os.getenv('CTFD_CACHE_MAX_ENTRIES', 256))
+
+# Maximum number of trackers refreshed concurrently per tick
+TRACKER_CONCURRENCY = int(os.getenv('TRACKER_CONCURRENCY', 8))
+
+# Seconds between batched flushes of tracked message metadata to the database
+METADATA_FLUSH_INTERVAL = float(os.getenv('METADATA_FLUSH_INTERVAL', 10))
+
+# Adaptive tracker scheduling (seconds)
+TRACKER_BASE_INTERVAL = float(os.getenv('TRACKER_BASE_INTERVAL', 60))
+TRACKER_MIN_INTERVAL = float(os.getenv('TRACKER_MIN_INTERVAL', 15))
+TRACKER_MAX_INTERVAL = float(os.getenv('TRACKER_MAX_INTERVAL', 900))
+TRACKER_ENDGAME_WINDOW = float(os.getenv('TRACKER_ENDGAME_WINDOW', 3600))
+
+# Discord edit budget per channel: at most DISCORD_EDIT_RATE edits every DISCORD_EDIT_PER seconds
+DISCORD_EDIT_RATE = int(os.getenv('DISCORD_EDIT_RATE', 5))
+DISCORD_EDIT_PER = float(os.getenv('DISCORD_EDIT_PER', 5))
+
+# Worker pool for parsing CTFd payloads and rendering trackers ("thread", "process" or "inline")
+RENDER_POOL_KIND = os.getenv('RENDER_POOL_KIND', 'thread')
+RENDER_WORKERS = int(os.getenv('RENDER_WORKERS', 2))
+
+# Seconds to batch database change notifications before syncing the tracker cache
+CACHE_SYNC_DEBOUNCE = float(os.getenv('CACHE_SYNC_DEBOUNCE', 0.5))
+
+# Audit log writer: seconds between batched flushes, and months of monthly partitions to keep (0 = all)
+AUDIT_FLUSH_INTERVAL = float(os.getenv('AUDIT_FLUSH_INTERVAL', 2))
+AUDIT_RETENTION_MONTHS = int(os.getenv('AUDIT_RETENTION_MONTHS', 0))
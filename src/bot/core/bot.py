@@ -1,5 +1,5 @@
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 import logging
 import sys
 import os
@@ -9,8 +9,22 @@ import asyncio
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 
 from features import *
+from config import (
+    CTFD_REQUEST_TIMEOUT, CTFD_CONNECT_TIMEOUT, CTFD_CACHE_TTL, CTFD_CACHE_MAX_ENTRIES,
+    TRACKER_CONCURRENCY, METADATA_FLUSH_INTERVAL,
+    TRACKER_BASE_INTERVAL, TRACKER_MIN_INTERVAL, TRACKER_MAX_INTERVAL, TRACKER_ENDGAME_WINDOW,
+    DISCORD_EDIT_RATE, DISCORD_EDIT_PER, RENDER_POOL_KIND, RENDER_WORKERS, CACHE_SYNC_DEBOUNCE,
+    AUDIT_FLUSH_INTERVAL, AUDIT_RETENTION_MONTHS
+)
 from shared.database import DatabaseManager
 from shared.ipc import IPCServer
+from utils.ctfd_client import CTFdClient
+from utils.thread_index import ForumThreadIndex
+from utils.render import RenderPool
+from utils.edit_queue import install_rate_limit_counter
+from utils.audit_writer import AuditLogWriter
+from core.scheduler import TrackerScheduler
+from core.cache_listener import CacheInvalidationListener
 
 logger = logging.getLogger(__name__)
 
@@ -28,23 +42,114 @@ class K17Bot(commands.Bot):
         self.db_manager = DatabaseManager()
         await self.db_manager.connect()
 
+        # Shared async CTFd client (keep-alive sessions and response cache per domain)
+        self.ctfd_client = CTFdClient(
+            timeout=CTFD_REQUEST_TIMEOUT,
+            connect_timeout=CTFD_CONNECT_TIMEOUT,
+            cache_ttl=CTFD_CACHE_TTL,
+            cache_max_entries=CTFD_CACHE_MAX_ENTRIES
+        )
+
+        # discord.py retries 429s itself and only logs them; count them for /metrics
+        install_rate_limit_counter()
+
+        # Parse CTFd payloads and render trackers off the event loop
+        self.render_pool = RenderPool(RENDER_WORKERS, RENDER_POOL_KIND)
+
+        # Forum thread index for "In-Progress" sections, kept current by thread events
+        self.thread_index = ForumThreadIndex()
+
         self.monad_manager = MonadManager()
-        self.ctfd_manager = CTFLeaderboardManager(self, self.db_manager)
+        self.ctfd_manager = CTFLeaderboardManager(
+            self, self.db_manager, self.ctfd_client,
+            max_concurrency=TRACKER_CONCURRENCY,
+            metadata_flush_interval=METADATA_FLUSH_INTERVAL,
+            edit_rate=DISCORD_EDIT_RATE,
+            edit_per=DISCORD_EDIT_PER,
+            thread_index=self.thread_index,
+            render_pool=self.render_pool
+        )
+        self.ctfd_manager.write_buffer.start()
+        
+        # Operator actions arriving over IPC are queued here and COPYed to audit_logs in batches
+        self.audit_writer = AuditLogWriter(
+            self.db_manager,
+            flush_interval=AUDIT_FLUSH_INTERVAL,
+            retention_months=AUDIT_RETENTION_MONTHS
+        )
+        self.audit_writer.start()
         
         # Start IPC server for web interface communication
-        self.ipc = IPCServer(self.ctfd_manager)
+        self.ipc = IPCServer(self.ctfd_manager, audit=self.audit_writer)
         asyncio.create_task(self.ipc.start())
         
-        # Start background tasks
-        self.minute_task.start()
+        # Per-tracker adaptive refresh scheduler (replaces the fixed one-minute loop)
+        self.scheduler = TrackerScheduler(
+            self.ctfd_manager,
+            base_interval=TRACKER_BASE_INTERVAL,
+            min_interval=TRACKER_MIN_INTERVAL,
+            max_interval=TRACKER_MAX_INTERVAL,
+            endgame_window=TRACKER_ENDGAME_WINDOW
+        )
+        
+        # Follow tracked_messages changes made by other processes (e.g. the web API)
+        self.cache_listener = CacheInvalidationListener(
+            self.ctfd_manager, self.db_manager, debounce=CACHE_SYNC_DEBOUNCE
+        )
+        
+        # Start background tasks; keep a reference so failures are logged rather than lost
+        self.startup_task = asyncio.create_task(self.start_scheduler())
+        self.startup_task.add_done_callback(self._log_startup_failure)
         
         logger.info("Bot setup complete!")
     
+    async def close(self):
+        if hasattr(self, 'startup_task') and not self.startup_task.done():
+            self.startup_task.cancel()
+        if hasattr(self, 'cache_listener'):
+            await self.cache_listener.stop()
+        if hasattr(self, 'scheduler'):
+            await self.scheduler.stop()
+        if hasattr(self, 'ctfd_manager'):
+            # Flush buffered metadata before the pool goes away
+            await self.ctfd_manager.write_buffer.stop()
+        if hasattr(self, 'audit_writer'):
+            await self.audit_writer.stop()
+        if hasattr(self, 'ctfd_client'):
+            await self.ctfd_client.close()
+        if hasattr(self, 'render_pool'):
+            self.render_pool.close()
+        if hasattr(self, 'db_manager'):
+            await self.db_manager.close()
+        await super().close()
+    
     ## On Ready Event
     async def on_ready(self):
         logger.info(f"✅ {self.user} is now online!")
         logger.info(f"Connected to {len(self.guilds)} guilds")
         logger.info(f"Bot ID: {self.user.id}") # type: ignore
+        
+        # Seed the forum thread index once; thread events keep it current afterwards
+        for guild in self.guilds:
+            self.thread_index.seed_guild(guild)
+
+    ## Thread Events (keep forum thread index current)
+    async def on_thread_create(self, thread: discord.Thread):
+        self.thread_index.upsert(thread)
+
+    async def on_thread_update(self, before: discord.Thread, after: discord.Thread):
+        self.thread_index.upsert(after)
+
+    async def on_thread_join(self, thread: discord.Thread):
+        # Threads the bot gains access to after seeding (e.g. unarchived ones)
+        self.thread_index.upsert(thread)
+
+    async def on_thread_remove(self, thread: discord.Thread):
+        # Threads dropped from the cache, e.g. when the bot loses access
+        self.thread_index.remove(thread.id)
+
+    async def on_raw_thread_delete(self, payload: discord.RawThreadDeleteEvent):
+        self.thread_index.remove(payload.thread_id)
 
     ## On Message Event
     async def on_message(self, message: discord.Message):
@@ -57,15 +162,17 @@ class K17Bot(commands.Bot):
         if message.content.startswith("!hello"):
             await self.monad_manager.handle_hello(message)
 
-    ## On minute task
-    @tasks.loop(minutes=1)
-    async def minute_task(self):
-        logger.info("🕐 Minute task triggered")
-        
-        await self.ctfd_manager.update_leaderboards()
-    
-    ## Pre Minute Task
-    @minute_task.before_loop
-    async def before_minute_task(self):
+    ## Start tracker scheduler once the cache is loaded
+    async def start_scheduler(self):
         await self.wait_until_ready()
         await self.ctfd_manager.initialize()
+        self.scheduler.start()
+        self.cache_listener.start()
+
+    @staticmethod
+    def _log_startup_failure(task: asyncio.Task):
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            logger.error("Tracker startup failed; trackers will not refresh until restart", exc_info=error)
@@ -0,0 +1,107 @@
+"""
+Real-time cache invalidation from Postgres LISTEN/NOTIFY.
+A trigger on tracked_messages publishes every row change; deletions and deactivations are
+evicted straight away, and other changes are batched into a debounced incremental sync.
+Changes written by the bot itself (e.g. buffered metadata flushes) are already in its cache and
+are ignored.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Optional
+
+from shared.database import TRACKED_MESSAGES_CHANNEL
+
+logger = logging.getLogger(__name__)
+
+
+class CacheInvalidationListener:
+    """Applies tracked_messages notifications to the leaderboard manager's cache
+
+    Runs on a dedicated connection that is re-opened if it drops; each (re)connect is followed
+    by a sync so changes made while disconnected are not missed.
+    """
+
+    def __init__(self, manager, db, feature_type: str = "ctf_leaderboard", debounce: float = 0.5,
+                 reconnect_delay: float = 5.0):
+        self.manager = manager
+        self.db = db
+        self.feature_type = feature_type
+        self.debounce = debounce
+        self.reconnect_delay = reconnect_delay
+
+        self._dirty = False
+        self._sync_task: Optional[asyncio.Task] = None
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"notifications": 0, "own_writes": 0, "evictions": 0, "syncs": 0, "reconnects": 0}
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        for task in (self._task, self._sync_task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = self._sync_task = None
+
+    def _on_notify(self, connection, pid, channel, payload: str):
+        try:
+            change = json.loads(payload)
+        except json.JSONDecodeError:
+            logger.warning(f"Ignoring malformed {channel} notification: {payload!r}")
+            return
+        if change.get("feature_type") != self.feature_type:
+            return
+        if pid in self.db.backend_pids:
+            # Sent by one of our own pooled connections
+            self.stats['own_writes'] += 1
+            return
+        self.stats['notifications'] += 1
+
+        # Removals need no row data, so apply them without a round trip
+        if change.get("op") == "DELETE" or change.get("is_active") is False:
+            if self.manager.evict(int(change["message_id"])):
+                self.stats['evictions'] += 1
+            return
+        self.request_sync()
+
+    def request_sync(self):
+        """Schedule an incremental sync, coalescing bursts of notifications"""
+        self._dirty = True
+        if self._sync_task is None or self._sync_task.done():
+            self._sync_task = asyncio.create_task(self._sync())
+
+    async def _sync(self):
+        while self._dirty:
+            await asyncio.sleep(self.debounce)
+            self._dirty = False
+            try:
+                await self.manager.sync_cache()
+                self.stats['syncs'] += 1
+            except Exception as e:
+                logger.error(f"Cache sync after notification failed: {e}")
+
+    async def _run(self):
+        while True:
+            conn = None
+            try:
+                closed = asyncio.Event()
+                conn = await self.db.connect_listener(TRACKED_MESSAGES_CHANNEL, self._on_notify)
+                conn.add_termination_listener(lambda _: closed.set())
+                self.request_sync()  # Catch up on anything missed while not listening
+                await closed.wait()
+                logger.warning("Database notification connection closed, reconnecting")
+            except asyncio.CancelledError:
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+                raise
+            except Exception as e:
+                logger.error(f"Database notification listener failed: {e}")
+            self.stats['reconnects'] += 1
+            await asyncio.sleep(self.reconnect_delay)
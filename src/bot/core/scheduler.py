@@ -0,0 +1,188 @@
+"""
+Adaptive per-tracker refresh scheduler.
+Each tracked message gets its own next-due time in a heap; the loop sleeps until the earliest
+one, so idle trackers cost nothing between refreshes.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+
+from shared.metrics import Counter, Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+SCHEDULER_LAG_SECONDS = Histogram(
+    "k17_scheduler_lag_seconds", "Delay between a tracker falling due and its refresh starting"
+)
+TRACKER_OVERRUNS = Counter(
+    "k17_tracker_overruns", "Trackers that fell due while their previous refresh was still running"
+)
+SCHEDULER_PASS_SECONDS = Histogram(
+    "k17_scheduler_pass_seconds", "Time from dispatching the trackers that fell due together until the last one finishes"
+)
+SCHEDULER_RUNNING = Gauge("k17_scheduler_running_refreshes", "Tracker refreshes currently in flight")
+SCHEDULER_TRACKERS = Gauge("k17_scheduler_trackers", "Trackers with a pending refresh")
+
+
+class TrackerScheduler:
+    """Heap-ordered scheduler giving every tracker its own adaptive refresh interval
+
+    Intervals come from the tracker's metadata (`poll_interval`, `ctf_start`, `ctf_end`):
+    - before the CTF starts, poll slowly until the start time
+    - within `endgame_window` of the end, poll at `min_interval`
+    - after the end, or while content is unchanged, back off exponentially to `max_interval`
+    """
+
+    def __init__(self, manager, base_interval: float = 60, min_interval: float = 15,
+                 max_interval: float = 900, endgame_window: float = 3600, jitter: float = 0.1):
+        self.manager = manager
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.endgame_window = endgame_window
+        self.jitter = jitter
+
+        self._heap: List[Tuple[float, int, int]] = []  # (due time, tiebreak, message_id)
+        self._due: Dict[int, float] = {}  # Current due time per message; stale heap entries are skipped
+        self._intervals: Dict[int, float] = {}  # Last interval used per message, for backoff
+        self._counter = itertools.count()
+        self._running: Dict[int, asyncio.Task] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        manager.add_event_listener(self._on_cache_event)
+
+    def start(self):
+        """Schedule every cached tracker with jittered start times and start the loop"""
+        for message_id in self.manager.tracked_ids():
+            self.schedule(message_id, random.uniform(0, self.base_interval))
+        SCHEDULER_RUNNING.set_function(lambda: len(self._running))
+        SCHEDULER_TRACKERS.set_function(lambda: len(self._due))
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        logger.info(f"Tracker scheduler started with {len(self._due)} trackers")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def schedule(self, message_id: int, delay: float):
+        """(Re)schedule a tracker to refresh after `delay` seconds"""
+        due = time.monotonic() + delay
+        self._due[message_id] = due
+        heapq.heappush(self._heap, (due, next(self._counter), message_id))
+        self._wakeup.set()
+
+    def remove(self, message_id: int):
+        """Stop scheduling a tracker; its heap entry is discarded lazily"""
+        self._due.pop(message_id, None)
+        self._intervals.pop(message_id, None)
+
+    def _on_cache_event(self, event: dict):
+        """Keep the schedule in step with trackers being created, deleted or reloaded"""
+        event_type = event["type"]
+        if event_type == "tracker_created":
+            message_id = int(event["message_id"])
+            self.schedule(message_id, self._next_interval(message_id, changed=True))
+        elif event_type == "tracker_deleted":
+            self.remove(int(event["message_id"]))
+        elif event_type == "cache_reloaded":
+            tracked = set(self.manager.tracked_ids())
+            for message_id in list(self._due):
+                if message_id not in tracked:
+                    self.remove(message_id)
+            for message_id in tracked - set(self._due):
+                self.schedule(message_id, random.uniform(0, self.base_interval))
+
+    def _next_interval(self, message_id: int, changed: Optional[bool]) -> float:
+        """Pick the delay until a tracker's next refresh"""
+        tracked = self.manager.get_tracked(message_id)
+        base = float((tracked and tracked.poll_interval) or self.base_interval)
+        previous = self._intervals.get(message_id, base)
+
+        # Counters count refreshes, so they keep a fixed cadence
+        if tracked is None or tracked.message_type == 'counter':
+            interval = base
+        else:
+            now = time.time()
+            start = tracked.start_at
+            end = tracked.end_at
+
+            if start is not None and now < start:
+                # Not started yet: wake up at the start, but no later than max_interval
+                interval = max(base, min(start - now, self.max_interval))
+            elif end is not None and now >= end:
+                # CTF is over: back off towards max_interval
+                interval = previous * 2
+            elif end is not None and end - now <= self.endgame_window:
+                # Final stretch: scores move fast, poll as often as allowed
+                interval = self.min_interval
+            elif changed:
+                interval = base
+            else:
+                # Unchanged or failed: exponential backoff
+                interval = previous * 2
+
+        interval = min(max(interval, self.min_interval), self.max_interval)
+        self._intervals[message_id] = interval
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    async def _refresh(self, message_id: int):
+        try:
+            changed = await self.manager.refresh_message(message_id)
+        finally:
+            self._running.pop(message_id, None)
+
+        # Deleted trackers (e.g. deactivated on NotFound) drop out of the schedule
+        if message_id in self._due:
+            self.schedule(message_id, self._next_interval(message_id, changed))
+
+    @staticmethod
+    def _time_pass(tasks: List[asyncio.Task], started: float):
+        """Observe a pass's duration once all of its refreshes are done"""
+        remaining = len(tasks)
+
+        def done(_):
+            nonlocal remaining
+            remaining -= 1
+            if not remaining:
+                SCHEDULER_PASS_SECONDS.observe(time.monotonic() - started)
+
+        for task in tasks:
+            task.add_done_callback(done)
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            now = time.monotonic()
+            dispatched = []
+
+            while self._heap and self._heap[0][0] <= now:
+                due, _, message_id = heapq.heappop(self._heap)
+                if self._due.get(message_id) != due:
+                    continue  # Superseded or removed entry
+                if message_id in self._running:
+                    # Rescheduled once the current refresh finishes
+                    TRACKER_OVERRUNS.inc()
+                    continue
+                SCHEDULER_LAG_SECONDS.observe(now - due)
+                task = self._running[message_id] = asyncio.create_task(self._refresh(message_id))
+                dispatched.append(task)
+            if dispatched:
+                self._time_pass(dispatched, now)
+
+            timeout = self._heap[0][0] - now if self._heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
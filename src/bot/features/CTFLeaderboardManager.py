@@ -3,111 +3,165 @@
 ## https://docs.ctfd.io/docs/api/redoc/
 
 import discord
+import asyncio
+import hashlib
 import logging
 import sys
 import os
-import json
-import requests
+import time
+from collections import deque
+from datetime import timedelta
+from typing import Optional
 
 # Add parent directory to path to import shared modules
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 
 from shared.database import DatabaseManager
+from shared.metrics import Histogram
+from utils.ctfd_client import CTFdClient, CTFdError
+from utils.write_buffer import MetadataWriteBuffer
+from utils.edit_queue import EditDispatcher, PRIORITY_OPERATOR
+from utils.thread_index import ForumThreadIndex
+from utils.message_cache import MessageCache, TrackedMessage
+from utils.render import (DEFAULT_TEAM_NAME, RenderError, RenderPool, challenge_summary_extractor,
+                          render_full_scan, render_team_scoped, team_position_extractor)
 
 logger = logging.getLogger(__name__)
 
-# Hard-coded message template for CTFd tracker
-CTFD_TRACKER_TEMPLATE = """
-```
-==============================
-========== UNSW K17 ==========
-==============================
-* Position:     {position} 
-* Challenges:   {solved_rate}
-
-Solves:
-{solves}
-In-Progress:
-{progress}
-```
-"""
-
-def format_leaderboard_entry(ctfd_domain, api_key=None, forum_channel=None) -> str:
-    api_url = f"{ctfd_domain}api/v1/"
-    
-    headers = {}
-    if api_key:
-        headers['Authorization'] = f'Token {api_key}'
-        headers["Content-Type"] = "application/json"
+# The challenge list only changes when challenges are released, so team-scoped trackers cache it longer (seconds)
+CHALLENGE_LIST_TTL = 300
 
-    res = requests.get(api_url + "scoreboard", headers=headers)
-    scoreboard = json.loads(res.text)['data']
+# Incremental syncs re-read rows this far behind the watermark, since updated_at is stamped at
+# transaction start and a slow writer can commit a row older than rows already seen
+SYNC_OVERLAP = timedelta(seconds=5)
 
-    position = 0
-    solved_count = 0
-    
+TICK_SECONDS = Histogram("k17_tick_seconds", "Duration of a manually triggered refresh of every tracked message")
+TRACKER_REFRESH_SECONDS = Histogram(
+    "k17_tracker_refresh_seconds", "Duration of one tracked message refresh, excluding the concurrency wait",
+    ("message_type", "result")
+)
 
-    for player in scoreboard:
-        if player["name"] == "K17":
-            position = player["pos"]
-            break
-
-    res = requests.get(api_url + "challenges", headers=headers)
-    solved_rate="1/23"
-
-    challenges = json.loads(res.text)['data']
-    solved_challs = []
-    for challenge in challenges:
-        logger.debug(f"Challenge: {challenge}")
-        if challenge["solved_by_me"]:
-            solved_count += 1
-            solved_challs.append(challenge)
-    solved_rate=f"{solved_count}/{len(challenges)}"
-
-    solves=""
-    prev_tag = ""
-    for challenge in sorted(solved_challs, key = lambda x: x['category']):
-        if challenge['category'].upper() != prev_tag:
-            prev_tag = challenge['category'].upper()
-            solves += f"\t[{prev_tag}]\n"
-        solves += f"\t\t* {challenge['name']}\n"
-
-    # Get in-progress challenges from forum posts
-    progress = ""
-    if forum_channel and isinstance(forum_channel, discord.ForumChannel):
-        logger.debug(f"Forum channel found: {forum_channel.name} (ID: {forum_channel.id})")
-        logger.debug(f"Total threads in channel: {len(forum_channel.threads)}")
-        
-        # Get all active threads (forum posts)
-        prev_tag = ""
-        for thread in sorted(forum_channel.threads, key = lambda x: x.name):
-            logger.debug(f"Thread: {thread.name} | Archived: {thread.archived} | ID: {thread.id}")
-            if not thread.archived:
-                if "SOLVED" in thread.name.upper():
-                    continue
-                parsed = thread.name.split(" ")
-                myname = " ".join(parsed[1:])
-                if parsed[0].upper() != prev_tag:
-                    prev_tag = parsed[0].upper()
-                    progress += f"\t{prev_tag}\n"
-                progress += f"\t\t* {myname}\n"
-        
-        logger.debug(f"Active threads found: {progress.count('*')}")
+async def fetch_challenge_summaries(client: CTFdClient, pool: RenderPool, ctfd_domain, api_key=None, ttl=None):
+    """Stream the challenge list down to (name, category, solved_by_me) tuples"""
+    return await client.get_extracted(ctfd_domain, "challenges", api_key, challenge_summary_extractor,
+                                      "summary", ttl=ttl, run=pool.run_local)
+
+async def fetch_team_scoped(client: CTFdClient, pool: RenderPool, ctfd_domain, api_key=None, team_id=None):
+    """Fetch the team's own record and solves instead of the full scoreboard
+
+    Returns raw (team, solves) bodies and the challenge count, or None if the team-scoped
+    endpoints are not available with this configuration.
+    """
+    if team_id:
+        account = f"teams/{team_id}"
+    elif api_key:
+        account = "teams/me"
     else:
-        logger.debug(f"Forum channel issue - Channel: {forum_channel}, Type: {type(forum_channel)}")
+        return None
+
+    try:
+        team_raw = await client.get_raw(ctfd_domain, account, api_key)
+        solves_raw = await client.get_raw(ctfd_domain, f"{account}/solves", api_key)
+    except CTFdError as e:
+        if e.status is None:
+            raise
+        logger.debug(f"Team-scoped endpoints unavailable for {ctfd_domain} ({e}), falling back to scoreboard")
+        return None
+
+    challenges = await fetch_challenge_summaries(client, pool, ctfd_domain, api_key, ttl=CHALLENGE_LIST_TTL)
+    return team_raw, solves_raw, len(challenges)
 
-    return CTFD_TRACKER_TEMPLATE.format(
-        position=position,
-        solved_rate=solved_rate,
-        progress=progress,
-        solves=solves
+async def fetch_full_scan(client: CTFdClient, pool: RenderPool, ctfd_domain, api_key=None,
+                          team_name=DEFAULT_TEAM_NAME, team_id=None):
+    """Fallback: stream the scoreboard and challenge list, keeping only the team's position and
+    the challenge summaries, so large CTFs never hold a full payload in memory"""
+    positions = await client.get_extracted(
+        ctfd_domain, "scoreboard", api_key,
+        lambda: team_position_extractor(team_name, team_id),
+        f"position:{team_id or ''}:{team_name}", run=pool.run_local
     )
+    challenges = await fetch_challenge_summaries(client, pool, ctfd_domain, api_key)
+    return positions, challenges
+
+async def format_leaderboard_entry(client: CTFdClient, pool: RenderPool, ctfd_domain, api_key=None, progress="",
+                                   team_name=DEFAULT_TEAM_NAME, team_id=None) -> str:
+    """Render a tracker; `progress` is the forum's pre-rendered "In-Progress" section
+
+    Fetching happens on the event loop; parsing and formatting run in the render pool.
+    """
+    scoped = await fetch_team_scoped(client, pool, ctfd_domain, api_key, team_id)
+    if scoped is not None:
+        return await pool.run(render_team_scoped, *scoped, progress)
+
+    positions, challenges = await fetch_full_scan(client, pool, ctfd_domain, api_key, team_name, team_id)
+    return await pool.run(render_full_scan, positions, challenges, progress)
 
 class CTFLeaderboardManager:
-    def __init__(self, bot, db: DatabaseManager):
+    def __init__(self, bot, db: DatabaseManager, ctfd: CTFdClient, max_concurrency: int = 8,
+                 metadata_flush_interval: float = 10.0, change_log_size: int = 1024,
+                 edit_rate: int = 5, edit_per: float = 5.0, thread_index: Optional[ForumThreadIndex] = None,
+                 render_pool: Optional[RenderPool] = None):
         self.bot = bot
         self.db = db
-        self._message_cache = {}  # Cache: {message_id: {channel_id, guild_id, message_type, metadata}}
+        self.ctfd = ctfd
+        self.render_pool = render_pool or RenderPool(kind="inline")  # Parses and formats CTFd payloads
+        self.threads = thread_index or ForumThreadIndex()  # In-progress forum threads, fed by gateway events
+        self.write_buffer = MetadataWriteBuffer(db, metadata_flush_interval)  # Cache stays authoritative
+        self.edits = EditDispatcher(edit_rate, edit_per)  # All Discord edits go through per-channel queues
+        self._message_cache = MessageCache()  # Tracked messages with parsed metadata and render state
+        self._update_semaphore = asyncio.Semaphore(max_concurrency)  # Bounds trackers refreshed at once
+        self.edit_stats = {"performed": 0, "skipped": 0}
+        self._event_listeners = []  # Callbacks receiving cache change events (e.g. IPC subscribers)
+        # Cache versioning: seeded from the clock so versions keep increasing across restarts
+        self._cache_version = int(time.time() * 1000)
+        self._change_log = deque(maxlen=change_log_size)  # (version, message_id) per change, oldest first
+        self._change_log_floor = self._cache_version  # Deltas from before this version need a full reload
+        self._sync_watermark = None  # Newest updated_at applied from the database
+
+    def add_event_listener(self, callback):
+        """Register a callback invoked with every cache change event"""
+        self._event_listeners.append(callback)
+
+    def _emit(self, event_type: str, message_id: int = 0):
+        """Record a cache change under a new version and notify listeners"""
+        self._cache_version += 1
+        if event_type == "cache_reloaded":
+            # Bulk reload: the change log can no longer describe what changed
+            self._change_log.clear()
+            self._change_log_floor = self._cache_version
+        else:
+            self._change_log.append((self._cache_version, message_id))
+
+        if not self._event_listeners:
+            return
+        event = {
+            "type": event_type,
+            "version": self._cache_version,
+            "message_id": str(message_id),  # String to preserve precision in JSON
+            "data": self._cache_dict(message_id)
+        }
+        for callback in self._event_listeners:
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error(f"Event listener failed for {event_type}: {e}")
+
+    @staticmethod
+    def _digest(content: str) -> bytes:
+        return hashlib.blake2b(content.encode(), digest_size=16).digest()
+
+    def _content_changed(self, tracked: TrackedMessage, content: str) -> bool:
+        """Check rendered content against the digest of the last edit"""
+        return tracked.digest != self._digest(content)
+
+    def _record_edit(self, tracked: TrackedMessage, content: str):
+        """Remember the digest of content just sent to Discord"""
+        tracked.digest = self._digest(content)
+        self.edit_stats['performed'] += 1
+
+    def _cache_dict(self, message_id: int) -> Optional[dict]:
+        tracked = self._message_cache.get(message_id)
+        return tracked.to_dict() if tracked is not None else None
 
     async def initialize(self):
         # Fetch all existing tracked messages from DB and populate cache
@@ -118,25 +172,8 @@ class CTFLeaderboardManager:
         
         if existing:
             # Populate cache with existing messages
-            for record in existing:
-                # Parse metadata if it's a JSON string, otherwise use as-is
-                metadata = record['metadata']
-                if isinstance(metadata, str):
-                    try:
-                        metadata = json.loads(metadata)
-                    except json.JSONDecodeError:
-                        metadata = {}
-                elif metadata is None:
-                    metadata = {}
-                
-                self._message_cache[record['message_id']] = {
-                    'channel_id': record['channel_id'],
-                    'guild_id': record['guild_id'],
-                    'message_type': record.get('message_type', 'counter'),
-                    'metadata': metadata
-                }
+            self._load_all(existing)
             logger.info(f"Found {len(existing)} existing CTF leaderboard messages, loaded into cache")
-            logger.info(f"Cache contents: {self._message_cache}")
             return
         
         # No existing messages, create a new one in my test channel
@@ -160,108 +197,275 @@ class CTFLeaderboardManager:
         )
         
         # Add to cache
-        self._message_cache[msg.id] = {
-            'channel_id': channel.id,
-            'guild_id': channel.guild.id,
-            'message_type': 'counter',
-            'metadata': {"counter": 0}
-        }
+        self._message_cache.add(TrackedMessage(msg.id, channel.id, channel.guild.id, 'counter', {"counter": 0}))
         
         logger.info(f"Created and tracked counting message with ID {msg.id}")
 
+    def _load_all(self, records):
+        """Replace the cache with the given active rows"""
+        previous = self._message_cache
+        self._message_cache = MessageCache()
+        for record in records:
+            self._advance_watermark(record)
+            cached = previous.get(record['message_id'])
+            if cached is not None and self.write_buffer.is_pending(cached.message_id):
+                self._message_cache.add(cached)  # Unflushed local writes are newer than the row
+                continue
+            tracked = TrackedMessage.from_record(record)
+            if cached is not None:
+                tracked.digest = cached.digest  # Keep skipping unchanged edits across reloads
+            self._message_cache.add(tracked)
+        for message_id in previous:
+            if message_id not in self._message_cache:
+                self.write_buffer.discard(message_id)
+        self._emit("cache_reloaded")
 
-    async def update_leaderboards(self):
-        # Use cached messages instead of querying database
-        for message_id, data in list(self._message_cache.items()):
-            channel = self.bot.get_channel(data['channel_id'])
+    def _advance_watermark(self, record):
+        updated_at = record.get('updated_at')
+        if updated_at is not None and (self._sync_watermark is None or updated_at > self._sync_watermark):
+            self._sync_watermark = updated_at
 
-            if not isinstance(channel, discord.TextChannel):
+    async def reload_cache(self, full: bool = False) -> dict:
+        """Bring the cache up to date with the database
+
+        By default only rows changed since the last sync are applied. `full` re-reads every
+        active row instead, which also drops rows hard-deleted outside the bot.
+        """
+        if full:
+            existing = await self.db.get_tracked_messages(feature_type="ctf_leaderboard", is_active=True)
+            self._load_all(existing)
+            logger.info(f"Fully reloaded {len(existing)} CTF leaderboard messages")
+            return {"full": True, "loaded": len(existing)}
+        return await self.sync_cache()
+
+    async def sync_cache(self) -> dict:
+        """Apply rows changed since the watermark as upserts or evictions; costs O(changes)"""
+        since = self._sync_watermark - SYNC_OVERLAP if self._sync_watermark is not None else None
+        changed = await self.db.get_tracked_messages_changed_since("ctf_leaderboard", since)
+
+        counts = {"full": False, "fetched": len(changed), "upserted": 0, "evicted": 0, "skipped": 0}
+        for record in changed:
+            self._advance_watermark(record)
+            message_id = record['message_id']
+
+            # The cache is authoritative while a write for this message hasn't landed yet
+            if self.write_buffer.is_pending(message_id):
+                counts['skipped'] += 1
                 continue
-        
+
+            if not record['is_active']:
+                if self.evict(message_id):
+                    counts['evicted'] += 1
+                continue
+
+            tracked = TrackedMessage.from_record(record)
+            previous = self._message_cache.get(message_id)
+            if previous is not None:
+                if previous.to_dict() == tracked.to_dict():
+                    continue  # Seen already, e.g. our own flush or the overlap window
+                tracked.digest = previous.digest
+            self._message_cache.add(tracked)
+            counts['upserted'] += 1
+            self._emit("tracker_created" if previous is None else "tracker_updated", message_id)
+
+        if counts['upserted'] or counts['evicted']:
+            logger.info(f"Cache sync applied {counts['upserted']} upserts and {counts['evicted']} evictions")
+        return counts
+
+    def evict(self, message_id: int) -> bool:
+        """Drop a message that was deleted or deactivated; returns whether it was cached"""
+        if self._message_cache.pop(message_id) is None:
+            return False
+        self.write_buffer.discard(message_id)
+        self._emit("tracker_deleted", message_id)
+        return True
+
+
+    async def update_leaderboards(self):
+        # Use cached messages instead of querying database, refreshing trackers concurrently
+        with TICK_SECONDS.time():
+            await asyncio.gather(*(
+                self._update_message_bounded(tracked)
+                for tracked in self._message_cache.values()
+            ))
+
+    async def refresh_message(self, message_id: int) -> Optional[bool]:
+        """Refresh one tracked message by ID (used by the scheduler)
+
+        Returns True if its content changed, False if unchanged, None if it failed or is gone.
+        """
+        tracked = self._message_cache.get(message_id)
+        if tracked is None:
+            return None
+        return await self._update_message_bounded(tracked)
+
+    async def _update_message_bounded(self, tracked: TrackedMessage) -> Optional[bool]:
+        """Refresh one tracked message under the concurrency limit, isolating its failures"""
+        async with self._update_semaphore:
+            start = time.perf_counter()
+            changed = None
             try:
-                message = await channel.fetch_message(message_id)
-                message_type = data.get('message_type', 'counter')
+                changed = await self._update_message(tracked)
+                return changed
+            except Exception as e:
+                logger.error(f"Unexpected error updating message {tracked.message_id}: {e}", exc_info=True)
+                return None
+            finally:
+                result = "failed" if changed is None else "changed" if changed else "unchanged"
+                TRACKER_REFRESH_SECONDS.labels(tracked.message_type, result).observe(time.perf_counter() - start)
+
+    async def _update_message(self, tracked: TrackedMessage) -> Optional[bool]:
+        """Refresh a single tracked message; returns whether its content changed"""
+        message_id = tracked.message_id
+        channel = self.bot.get_channel(tracked.channel_id)
+
+        if not isinstance(channel, discord.TextChannel):
+            return None
+    
+        try:
+            message_type = tracked.message_type
+            
+            if message_type == 'counter':
+                # Get current counter from cache
+                current_count = tracked.counter or 0
+                new_count = current_count + 1
+                
+                # Update cache and queue the database write before awaiting the edit, so an
+                # operator update_counter arriving meanwhile (and coalesced into the same
+                # edit) is the value that sticks rather than being overwritten by this one
+                tracked.counter = new_count
+                self.write_buffer.mark(message_id, tracked.metadata)
+                self._emit("counter_changed", message_id)
+                
+                # Update message
+                content = await self.edits.edit(channel, message_id, f"Counting: {new_count}")
+                self._record_edit(tracked, content)
+                
+                logger.debug(f"Updated message {message_id} to count {new_count}")
+                return True
+            
+            elif message_type == 'ctfd_tracker':
+                # Get CTFd domain, API key, and forum channel from metadata
+                ctfd_domain = tracked.ctfd_domain or ''
+                api_key = tracked.api_key
+                forum_channel_id = tracked.forum_channel_id
+                
+                # In-progress section from the forum thread index, if configured
+                progress = ""
+                if forum_channel_id:
+                    progress = self.threads.render(self.bot.get_channel(forum_channel_id))
                 
-                if message_type == 'counter':
-                    # Get current counter from cached metadata
-                    metadata = data['metadata']
-                    current_count = metadata.get('counter', 0)
-                    new_count = current_count + 1
-                    
-                    # Update message
-                    await message.edit(content=f"Counting: {new_count}")
-                    
-                    # Update cache
-                    self._message_cache[message_id]['metadata']['counter'] = new_count
-                    
-                    # Update metadata in database
-                    await self.db.update_tracked_message_metadata(
-                        message_id=message_id,
-                        metadata={"counter": new_count}
-                    )
-                    
-                    logger.debug(f"Updated message {message_id} to count {new_count}")
+                # Generate formatted leaderboard content
+                formatted_content = await format_leaderboard_entry(
+                    self.ctfd, self.render_pool, ctfd_domain, api_key, progress,
+                    team_name=tracked.team_name or DEFAULT_TEAM_NAME,
+                    team_id=tracked.team_id
+                )
+
+                # Skip the Discord round trip entirely if nothing changed since the last render
+                if not self._content_changed(tracked, formatted_content):
+                    self.edit_stats['skipped'] += 1
+                    logger.debug(f"CTFd tracker message {message_id} unchanged, skipping edit")
+                    return False
                 
-                elif message_type == 'ctfd_tracker':
-                    # Get CTFd domain, API key, and forum channel from metadata
-                    metadata = data['metadata']
-                    ctfd_domain = metadata.get('ctfd_domain', '')
-                    api_key = metadata.get('api_key')
-                    forum_channel_id = metadata.get('forum_channel_id')
-                    
-                    # Get forum channel if configured
-                    forum_channel = None
-                    if forum_channel_id:
-                        forum_channel = self.bot.get_channel(forum_channel_id)
-                    
-                    # Generate formatted leaderboard content
-                    formatted_content = format_leaderboard_entry(ctfd_domain, api_key, forum_channel)
-                    
-                    # Update message
-                    await message.edit(content=formatted_content)
-                    
-                    logger.debug(f"Updated CTFd tracker message {message_id} for {ctfd_domain}")
+                # Update message
+                content = await self.edits.edit(channel, message_id, formatted_content)
+                self._record_edit(tracked, content)
+                self._emit("tracker_rendered", message_id)
                 
-            except discord.NotFound:
-                logger.error(f"Message {message_id} not found, deactivating")
-                await self.db.deactivate_tracked_message(message_id)
-                # Remove from cache
-                del self._message_cache[message_id]
-            except discord.HTTPException as e:
-                logger.error(f"Failed to edit message {message_id}: {e}")
+                logger.debug(f"Updated CTFd tracker message {message_id} for {ctfd_domain}")
+                return True
+            
+        except discord.NotFound:
+            logger.error(f"Message {message_id} not found, deactivating")
+            await self.db.deactivate_tracked_message(message_id)
+            # Remove from cache
+            self.evict(message_id)
+        except discord.HTTPException as e:
+            logger.error(f"Failed to edit message {message_id}: {e}")
+        except (CTFdError, RenderError) as e:
+            logger.error(f"Failed to fetch CTFd data for message {message_id}: {e}")
+        return None
     
     # IPC Methods for Web Interface
     
-    def get_cache(self) -> dict:
-        """Return the entire message cache for the web interface"""
+    def get_cache(self, guild_id: Optional[int] = None, channel_id: Optional[int] = None,
+                  ctfd_domain: Optional[str] = None) -> dict:
+        """Return the message cache for the web interface, optionally narrowed to one guild,
+        channel or CTFd domain"""
+        if channel_id is not None:
+            messages = self._message_cache.in_channel(channel_id)
+        elif guild_id is not None:
+            messages = self._message_cache.in_guild(guild_id)
+        elif ctfd_domain is not None:
+            messages = self._message_cache.for_domain(ctfd_domain)
+        else:
+            messages = self._message_cache.values()
         # Convert integer message IDs to strings to preserve precision in JSON
-        return {str(k): v for k, v in self._message_cache.items()}
+        return {str(tracked.message_id): tracked.to_dict() for tracked in messages}
+    
+    @property
+    def cache_version(self) -> int:
+        return self._cache_version
+    
+    def get_cache_delta(self, since: int) -> Optional[dict]:
+        """Return entries changed or removed after version `since`
+        
+        Returns None when the change log can't cover that range and a full reload is needed.
+        """
+        if since > self._cache_version or since < self._change_log_floor:
+            return None
+        if self._change_log and self._change_log[0][0] > since + 1:
+            return None  # Older changes have been evicted from the log
+        
+        touched = {message_id for version, message_id in self._change_log if version > since}
+        changed = {}
+        removed = []
+        for message_id in touched:
+            tracked = self._message_cache.get(message_id)
+            if tracked is not None:
+                changed[str(message_id)] = tracked.to_dict()
+            else:
+                removed.append(str(message_id))
+        return {"changed": changed, "removed": removed}
+    
+    def get_edit_stats(self) -> dict:
+        """Return counts of Discord edits performed and skipped as unchanged"""
+        return dict(self.edit_stats)
+    
+    def tracked_ids(self) -> list:
+        """IDs of every tracked message currently in the cache"""
+        return list(self._message_cache)
     
-    def get_cache_message(self, message_id: int) -> dict:
+    def get_tracked(self, message_id: int) -> Optional[TrackedMessage]:
+        """Get the cached record for a message"""
+        return self._message_cache.get(message_id)
+    
+    def get_cache_message(self, message_id: int) -> Optional[dict]:
         """Get a specific message from cache"""
-        return self._message_cache.get(message_id)  # type: ignore
+        return self._cache_dict(message_id)
     
     async def update_counter(self, message_id: int, value: int) -> bool:
         """Update a specific counter value from the web interface"""
-        if message_id not in self._message_cache:
+        tracked = self._message_cache.get(message_id)
+        if tracked is None:
             logger.error(f"Message {message_id} not found in cache")
             return False
         
         try:
             # Update cache
-            self._message_cache[message_id]['metadata']['counter'] = value
+            tracked.counter = value
             
-            # Update database
-            await self.db.update_tracked_message_metadata(
-                message_id=message_id,
-                metadata={"counter": value}
-            )
+            # Queue database write
+            self.write_buffer.mark(message_id, tracked.metadata)
+            self._emit("counter_changed", message_id)
             
             # Update Discord message
-            channel = self.bot.get_channel(self._message_cache[message_id]['channel_id'])
+            channel = self.bot.get_channel(tracked.channel_id)
             if isinstance(channel, discord.TextChannel):
-                message = await channel.fetch_message(message_id)
-                await message.edit(content=f"Counting: {value}")
+                # Operator edits are sent ahead of background refreshes
+                content = await self.edits.edit(channel, message_id, f"Counting: {value}", PRIORITY_OPERATOR)
+                self._record_edit(tracked, content)
             
             logger.info(f"Manually updated counter for message {message_id} to {value}")
             return True
@@ -272,7 +476,9 @@ class CTFLeaderboardManager:
     
     async def create_tracked_message(self, channel_id: int, message_type: str = 'counter', 
                                      initial_counter: int = 0, ctfd_domain: str = "", 
-                                     ctfd_api_key: str = "", forum_channel_id: int = 0) -> dict:
+                                     ctfd_api_key: str = "", forum_channel_id: int = 0,
+                                     team_name: str = "", team_id: int = 0, poll_interval: int = 0,
+                                     ctf_start: str = "", ctf_end: str = "") -> dict:
         """Create a new tracked message in a specified channel"""
         try:
             channel = self.bot.get_channel(channel_id)
@@ -283,25 +489,42 @@ class CTFLeaderboardManager:
             
             # Create message based on type
             if message_type == 'counter':
+                await self.edits.reserve(channel.id)
                 msg = await channel.send(f"Counting: {initial_counter}")
                 metadata = {"counter": initial_counter}
             elif message_type == 'ctfd_tracker':
                 if not ctfd_domain:
                     return {"success": False, "error": "CTFd domain is required for ctfd_tracker type"}
                 
-                # Get forum channel if provided
-                forum_channel = None
+                # In-progress section from the forum thread index, if provided
+                progress = ""
                 if forum_channel_id:
-                    forum_channel = self.bot.get_channel(forum_channel_id)
+                    progress = self.threads.render(self.bot.get_channel(forum_channel_id))
                 
                 # Generate formatted leaderboard content
-                initial_message = format_leaderboard_entry(ctfd_domain, ctfd_api_key or None, forum_channel)
+                initial_message = await format_leaderboard_entry(
+                    self.ctfd, self.render_pool, ctfd_domain, ctfd_api_key or None, progress,
+                    team_name=team_name or DEFAULT_TEAM_NAME,
+                    team_id=team_id or None
+                )
+                await self.edits.reserve(channel.id)
                 msg = await channel.send(initial_message)
                 metadata = {"ctfd_domain": ctfd_domain}
                 if ctfd_api_key:
                     metadata["api_key"] = ctfd_api_key
                 if forum_channel_id:
                     metadata["forum_channel_id"] = forum_channel_id # type: ignore
+                if team_name:
+                    metadata["team_name"] = team_name
+                if team_id:
+                    metadata["team_id"] = team_id # type: ignore
+                # Scheduling hints: refresh interval and CTF window
+                if poll_interval:
+                    metadata["poll_interval"] = poll_interval # type: ignore
+                if ctf_start:
+                    metadata["ctf_start"] = ctf_start
+                if ctf_end:
+                    metadata["ctf_end"] = ctf_end
             else:
                 return {"success": False, "error": f"Unknown message type: {message_type}"}
             
@@ -316,12 +539,10 @@ class CTFLeaderboardManager:
             )
             
             # Add to cache
-            self._message_cache[msg.id] = {
-                'channel_id': channel.id,
-                'guild_id': channel.guild.id,
-                'message_type': message_type,
-                'metadata': metadata
-            }
+            tracked = TrackedMessage(msg.id, channel.id, channel.guild.id, message_type, metadata)
+            tracked.digest = self._digest(msg.content)
+            self._message_cache.add(tracked)
+            self._emit("tracker_created", msg.id)
             
             logger.info(f"Created new tracked message {msg.id} in channel {channel_id}")
             return {
@@ -342,16 +563,16 @@ class CTFLeaderboardManager:
         """Delete a tracked message from database and optionally from Discord"""
         try:
             # Check if message exists in cache
-            if message_id not in self._message_cache:
+            tracked = self._message_cache.get(message_id)
+            if tracked is None:
                 return {"success": False, "error": "Message not found in cache"}
             
             # Optionally delete from Discord
             if delete_discord_message:
                 try:
-                    channel_id = self._message_cache[message_id]['channel_id']
-                    channel = self.bot.get_channel(channel_id)
+                    channel = self.bot.get_channel(tracked.channel_id)
                     if isinstance(channel, discord.TextChannel):
-                        message = await channel.fetch_message(message_id)
+                        message = channel.get_partial_message(message_id)
                         await message.delete()
                         logger.info(f"Deleted Discord message {message_id}")
                 except discord.NotFound:
@@ -363,7 +584,7 @@ class CTFLeaderboardManager:
             await self.db.delete_tracked_message(message_id)
             
             # Remove from cache
-            del self._message_cache[message_id]
+            self.evict(message_id)
             
             logger.info(f"Successfully deleted tracked message {message_id}")
             return {"success": True, "message": "Message deleted successfully"}
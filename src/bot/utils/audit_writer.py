@@ -0,0 +1,108 @@
+"""
+Asynchronous, batched audit log writer.
+Actions are queued in memory without touching the database and written in batches with COPY,
+so recording an operator action costs an append on the request path. The writer also keeps the
+monthly audit_logs partitions ahead of the clock and drops those past retention.
+"""
+
+import asyncio
+import json
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from shared.database import month_start
+from shared.metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+AUDIT_EVENTS = Counter("k17_audit_events", "Audit log entries by outcome", ("result",))
+
+AuditRecord = Tuple[int, Optional[int], str, str, datetime]  # In AUDIT_LOG_COLUMNS order
+
+
+class AuditLogWriter:
+    """Queues audit entries and flushes them to `audit_logs` in COPY batches"""
+
+    def __init__(self, db, flush_interval: float = 2.0, batch_size: int = 500, max_queue: int = 10_000,
+                 retention_months: int = 0):
+        self.db = db
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.retention_months = retention_months  # 0 keeps every partition
+        self._queue: Deque[AuditRecord] = deque()
+        self.max_queue = max_queue
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._partition_month: Optional[datetime] = None  # Month the partitions were last checked for
+        self._task: Optional[asyncio.Task] = None
+
+    def log(self, guild_id: int, action_type: str, details: Dict[str, Any], user_id: Optional[int] = None):
+        """Queue an entry; never blocks, and drops it if the queue is full"""
+        if len(self._queue) >= self.max_queue:
+            AUDIT_EVENTS.labels("dropped").inc()
+            logger.warning(f"Audit queue full, dropping {action_type} entry for guild {guild_id}")
+            return
+        self._queue.append((guild_id, user_id, action_type, json.dumps(details, default=str), datetime.now()))
+        if len(self._queue) >= self.batch_size:
+            self._wakeup.set()
+
+    @property
+    def pending(self) -> int:
+        return len(self._queue)
+
+    async def flush(self):
+        """Write everything queued, one COPY per batch"""
+        async with self._flush_lock:
+            while self._queue:
+                await self._maintain_partitions()
+                batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+                try:
+                    await self.db.copy_audit_logs(batch)
+                except Exception as e:
+                    logger.error(f"Failed to write {len(batch)} audit entries, will retry: {e}")
+                    # Put them back in order, ahead of anything queued since
+                    self._queue.extendleft(reversed(batch))
+                    return
+                AUDIT_EVENTS.labels("written").inc(len(batch))
+                logger.debug(f"Wrote {len(batch)} audit entries")
+
+    async def _maintain_partitions(self):
+        """Once a month: create the upcoming partitions and drop expired ones"""
+        month = month_start(datetime.now())
+        if month == self._partition_month:
+            return
+        try:
+            await self.db.ensure_audit_partitions(month)
+            if self.retention_months > 0:
+                await self.db.drop_audit_partitions_before(month_start(month, -self.retention_months))
+            self._partition_month = month
+        except Exception as e:
+            # Entries still land in the default partition; try again next flush
+            logger.error(f"Audit partition maintenance failed: {e}")
+
+    def start(self):
+        """Start the periodic flush loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush loop and write out anything still queued"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
@@ -0,0 +1,268 @@
+"""
+Async CTFd API client.
+Keeps one keep-alive aiohttp session per CTFd domain so tracker refreshes never block the event loop.
+Responses are shared between trackers through a TTL + LRU cache with single-flight fetches
+and ETag / If-Modified-Since revalidation. Large list endpoints can be streamed through an
+extractor so only the projected fields are ever held in memory or cached.
+API reference: https://docs.ctfd.io/docs/api/redoc/
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import aiohttp
+
+from shared.metrics import SIZE_BUCKETS, Histogram
+from utils.render import RenderError, extract_data
+
+logger = logging.getLogger(__name__)
+
+
+class CTFdError(Exception):
+    """Raised when a CTFd API request fails or returns an unusable payload"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class _CacheEntry:
+    """Cached response body (raw or extracted) plus the validators needed to revalidate it"""
+    __slots__ = ('data', 'etag', 'last_modified', 'fetched_at')
+
+    def __init__(self, data: Any, etag: Optional[str], last_modified: Optional[str], fetched_at: float):
+        self.data = data
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+
+
+CacheKey = Tuple[str, str, str, str]  # (domain, endpoint, credential digest, extraction variant)
+
+# Statuses meaning "this endpoint is not available to this credential" rather than a transient failure
+UNAVAILABLE_STATUSES = (401, 403, 404)
+
+# Bytes read from the socket per extractor step when streaming a response
+STREAM_CHUNK_SIZE = 64 * 1024
+
+CTFD_REQUEST_SECONDS = Histogram(
+    "k17_ctfd_request_seconds", "CTFd API request latency by domain and outcome", ("domain", "status")
+)
+CTFD_RESPONSE_BYTES = Histogram(
+    "k17_ctfd_response_bytes", "CTFd response bytes read by domain", ("domain",), buckets=SIZE_BUCKETS
+)
+
+
+class CTFdClient:
+    """Pooled async client for the CTFd REST API"""
+
+    def __init__(self, timeout: float = 10.0, connect_timeout: float = 5.0, limit_per_host: int = 4,
+                 cache_ttl: float = 30.0, cache_max_entries: int = 256, unavailable_ttl: float = 300.0):
+        self.timeout = aiohttp.ClientTimeout(total=timeout, sock_connect=connect_timeout)
+        self.limit_per_host = limit_per_host
+        self.cache_ttl = cache_ttl
+        self.cache_max_entries = cache_max_entries
+        self.unavailable_ttl = unavailable_ttl
+        self._sessions: Dict[str, aiohttp.ClientSession] = {}
+        self._cache: "OrderedDict[CacheKey, _CacheEntry]" = OrderedDict()  # LRU order, oldest first
+        self._inflight: Dict[CacheKey, asyncio.Future] = {}
+        self._unavailable: Dict[CacheKey, Tuple[CTFdError, float]] = {}  # Negative cache: {key: (error, expiry)}
+        self.cache_stats = {"hits": 0, "misses": 0, "revalidated": 0, "shared": 0, "evicted": 0,
+                            "bytes_read": 0, "early_stops": 0}
+
+    @staticmethod
+    def api_base(ctfd_domain: str) -> str:
+        """Normalise a configured domain into its API base URL"""
+        if not ctfd_domain.endswith('/'):
+            ctfd_domain += '/'
+        return f"{ctfd_domain}api/v1/"
+
+    def _session_for(self, ctfd_domain: str) -> aiohttp.ClientSession:
+        """Get (or lazily open) the keep-alive session for a domain"""
+        ctfd_domain = ctfd_domain.rstrip('/')
+        session = self._sessions.get(ctfd_domain)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=60,
+                ttl_dns_cache=300
+            )
+            session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+            self._sessions[ctfd_domain] = session
+        return session
+
+    @staticmethod
+    def _headers(api_key: Optional[str]) -> Dict[str, str]:
+        headers = {}
+        if api_key:
+            headers['Authorization'] = f'Token {api_key}'
+            headers["Content-Type"] = "application/json"
+        return headers
+
+    @staticmethod
+    def _cache_key(ctfd_domain: str, endpoint: str, api_key: Optional[str], variant: str = "") -> CacheKey:
+        # Key on a digest of the credential so responses are never shared across API keys,
+        # and on the extraction variant so differently projected results don't collide
+        credential = hashlib.sha256(api_key.encode()).hexdigest() if api_key else ""
+        return (ctfd_domain.rstrip('/'), endpoint, credential, variant)
+
+    async def get(self, ctfd_domain: str, endpoint: str, api_key: Optional[str] = None,
+                  ttl: Optional[float] = None) -> Any:
+        """GET an API endpoint and return the parsed `data` field"""
+        raw = await self.get_raw(ctfd_domain, endpoint, api_key, ttl)
+        try:
+            return extract_data(raw)
+        except RenderError as e:
+            raise CTFdError(f"{endpoint}: {e}")
+
+    async def get_raw(self, ctfd_domain: str, endpoint: str, api_key: Optional[str] = None,
+                      ttl: Optional[float] = None) -> bytes:
+        """GET an API endpoint and return the raw response body, served from cache while fresh
+
+        Parsing is left to the caller so it can happen off the event loop.
+        `ttl` overrides the default freshness window for slow-changing endpoints.
+        """
+        key = self._cache_key(ctfd_domain, endpoint, api_key)
+        return await self._cached(key, ctfd_domain, endpoint, api_key, ttl, self._read_body)
+
+    async def get_extracted(self, ctfd_domain: str, endpoint: str, api_key: Optional[str],
+                            make_extractor: Callable[[], Any], variant: str, ttl: Optional[float] = None,
+                            run: Optional[Callable[..., Awaitable[Any]]] = None) -> Any:
+        """GET an API endpoint, streaming the body through an extractor, and return its results
+
+        `make_extractor` builds a fresh StreamingArrayExtractor per fetch; `variant` names its
+        projection and is part of the cache key. Only the extracted results are cached.
+        `run` executes the extractor steps (e.g. RenderPool.run_local); by default they run inline.
+        """
+        key = self._cache_key(ctfd_domain, endpoint, api_key, variant)
+
+        async def consume(res: aiohttp.ClientResponse):
+            return await self._stream_body(res, make_extractor(), run)
+
+        return await self._cached(key, ctfd_domain, endpoint, api_key, ttl, consume)
+
+    async def _cached(self, key: CacheKey, ctfd_domain: str, endpoint: str, api_key: Optional[str],
+                      ttl: Optional[float], consume) -> Any:
+        """Serve a key from cache while fresh, otherwise fetch it once for all waiters"""
+        now = time.monotonic()
+
+        # Endpoints this credential recently could not access fail fast until the negative entry expires
+        unavailable = self._unavailable.get(key)
+        if unavailable is not None:
+            if unavailable[1] > now:
+                raise unavailable[0]
+            del self._unavailable[key]
+
+        entry = self._cache.get(key)
+        if entry is not None and entry.fetched_at + (self.cache_ttl if ttl is None else ttl) > now:
+            self._cache.move_to_end(key)
+            self.cache_stats['hits'] += 1
+            return entry.data
+
+        # Single-flight: concurrent trackers for the same key share one request
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._fetch(key, ctfd_domain, endpoint, api_key, consume))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.cache_stats['shared'] += 1
+
+        return await asyncio.shield(future)
+
+    async def _read_body(self, res: aiohttp.ClientResponse) -> Tuple[bytes, int]:
+        """Read the whole body; returns (body, bytes read)"""
+        body = await res.read()
+        self.cache_stats['bytes_read'] += len(body)
+        return body, len(body)
+
+    async def _stream_body(self, res: aiohttp.ClientResponse, extractor, run) -> Tuple[Any, int]:
+        """Feed the body to an extractor chunk by chunk, stopping as soon as it has what it needs
+
+        Returns (extracted results, bytes read).
+        """
+        async def step(fn, *args):
+            return await run(fn, *args) if run is not None else fn(*args)
+
+        size = 0
+        try:
+            async for chunk in res.content.iter_chunked(STREAM_CHUNK_SIZE):
+                size += len(chunk)
+                self.cache_stats['bytes_read'] += len(chunk)
+                if await step(extractor.feed, chunk):
+                    if not res.content.at_eof():
+                        # Leaving the rest unread closes the connection instead of returning it to the pool
+                        self.cache_stats['early_stops'] += 1
+                    break
+            return await step(extractor.close), size
+        except ValueError as e:
+            raise CTFdError(f"{res.url}: invalid response ({e})")
+
+    async def _fetch(self, key: CacheKey, ctfd_domain: str, endpoint: str, api_key: Optional[str],
+                     consume) -> Any:
+        """Fetch from CTFd, revalidating any stale entry, and store the result"""
+        url = self.api_base(ctfd_domain) + endpoint
+        session = self._session_for(ctfd_domain)
+
+        headers = self._headers(api_key)
+        stale = self._cache.get(key)
+        if stale is not None:
+            if stale.etag:
+                headers['If-None-Match'] = stale.etag
+            if stale.last_modified:
+                headers['If-Modified-Since'] = stale.last_modified
+
+        domain = key[0]
+        status = "error"
+        start = time.perf_counter()
+        try:
+            async with session.get(url, headers=headers) as res:
+                status = str(res.status)
+                if res.status == 304 and stale is not None:
+                    self.cache_stats['revalidated'] += 1
+                    stale.fetched_at = time.monotonic()
+                    self._cache.move_to_end(key)
+                    return stale.data
+                if res.status != 200:
+                    error = CTFdError(f"{url} returned HTTP {res.status}", status=res.status)
+                    if res.status in UNAVAILABLE_STATUSES:
+                        self._unavailable[key] = (error, time.monotonic() + self.unavailable_ttl)
+                    raise error
+                body, size = await consume(res)
+                CTFD_RESPONSE_BYTES.labels(domain).observe(size)
+                etag = res.headers.get('ETag')
+                last_modified = res.headers.get('Last-Modified')
+        except asyncio.TimeoutError:
+            status = "timeout"
+            raise CTFdError(f"{url} timed out")
+        except aiohttp.ClientError as e:
+            status = "error"
+            raise CTFdError(f"{url} failed: {e}")
+        finally:
+            CTFD_REQUEST_SECONDS.labels(domain, status).observe(time.perf_counter() - start)
+
+        self.cache_stats['misses'] += 1
+        self._store(key, _CacheEntry(body, etag, last_modified, time.monotonic()))
+        return body
+
+    def _store(self, key: CacheKey, entry: _CacheEntry):
+        """Insert an entry, evicting least recently used entries past the size bound"""
+        self._cache[key] = entry
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_max_entries:
+            self._cache.popitem(last=False)
+            self.cache_stats['evicted'] += 1
+
+    async def close(self):
+        """Close every open session"""
+        for session in self._sessions.values():
+            if not session.closed:
+                await session.close()
+        self._sessions.clear()
+        self._cache.clear()
+        self._unavailable.clear()
+        logger.info("CTFd client sessions closed")
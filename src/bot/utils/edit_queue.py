@@ -0,0 +1,231 @@
+"""
+Rate-limit-aware Discord edit dispatcher.
+Edits are queued per channel behind a token bucket, pending edits to the same message are
+coalesced into the latest content, and operator edits jump ahead of background refreshes.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+from shared.metrics import Counter, Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+DISCORD_EDIT_SECONDS = Histogram(
+    "k17_discord_edit_seconds", "Discord message edit latency, including library rate-limit retries", ("outcome",)
+)
+DISCORD_EDIT_WAIT_SECONDS = Histogram(
+    "k17_discord_edit_wait_seconds", "Time edits spend queued before being sent"
+)
+DISCORD_EDIT_QUEUE_DEPTH = Gauge("k17_discord_edit_queue_depth", "Edits waiting to be sent across all channels")
+DISCORD_RATE_LIMITS = Counter(
+    "k17_discord_rate_limits", "Discord 429 responses by scope", ("scope",)
+)
+
+# Lower value is served first
+PRIORITY_OPERATOR = 0
+PRIORITY_BACKGROUND = 1
+
+
+class _PendingEdit:
+    __slots__ = ('channel', 'message_id', 'content', 'priority', 'enqueued_at', 'waiters')
+
+    def __init__(self, channel, message_id: int, content: str, priority: int):
+        self.channel = channel
+        self.message_id = message_id
+        self.content = content
+        self.priority = priority
+        self.enqueued_at = time.monotonic()
+        self.waiters: List[asyncio.Future] = []
+
+
+class _ChannelQueue:
+    """Pending edits and token bucket for one channel"""
+
+    def __init__(self, rate: int, per: float):
+        self.rate = rate
+        self.per = per
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+        self.pending: Dict[int, _PendingEdit] = {}  # {message_id: edit}, one entry per message
+        self.worker: Optional[asyncio.Task] = None
+
+    def refill(self) -> float:
+        """Top the bucket up for the time elapsed and return the tokens available"""
+        now = time.monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate / self.per)
+        self.updated = now
+        return self.tokens
+
+    @property
+    def idle(self) -> bool:
+        """Nothing pending or sending, and the bucket is back to full (same as a new queue)"""
+        return not self.pending and self.worker is None and self.refill() >= self.rate
+
+    async def take_token(self):
+        """Wait until the bucket allows another request"""
+        while True:
+            self.refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) * self.per / self.rate)
+
+
+class RateLimitCounter(logging.Handler):
+    """Counts the 429s discord.py handles internally, which only surface as log warnings
+
+    discord.py logs every retried 429 as "responded with 429" and, for global limits, follows it
+    with "Global rate limit has been hit" in the same step. The route count is therefore deferred
+    by one loop iteration and taken back if the global warning arrives first.
+    """
+
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self._pending_route = 0
+
+    def emit(self, record: logging.LogRecord):
+        message = record.msg if isinstance(record.msg, str) else ""
+        if "responded with 429" in message:
+            if "erroring instead" in message:
+                # Not retried, so no global warning follows
+                DISCORD_RATE_LIMITS.labels("route").inc()
+                return
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                DISCORD_RATE_LIMITS.labels("route").inc()
+                return
+            self._pending_route += 1
+            loop.call_soon(self._count_route)
+        elif message.startswith("Global rate limit has been hit"):
+            if self._pending_route:
+                self._pending_route -= 1
+            DISCORD_RATE_LIMITS.labels("global").inc()
+
+    def _count_route(self):
+        if self._pending_route:
+            self._pending_route -= 1
+            DISCORD_RATE_LIMITS.labels("route").inc()
+
+
+def install_rate_limit_counter():
+    """Attach a RateLimitCounter to the discord.http logger (once)"""
+    http_logger = logging.getLogger("discord.http")
+    if not any(isinstance(handler, RateLimitCounter) for handler in http_logger.handlers):
+        http_logger.addHandler(RateLimitCounter())
+
+
+class EditDispatcher:
+    """Queues message edits per channel, coalescing and prioritising them"""
+
+    def __init__(self, rate: int = 5, per: float = 5.0):
+        self.rate = rate
+        self.per = per
+        self._queues: Dict[int, _ChannelQueue] = {}
+        self._wait_times: Deque[float] = deque(maxlen=512)  # Recent enqueue-to-send waits (seconds)
+        self.stats = {"queued": 0, "coalesced": 0, "completed": 0, "failed": 0}
+        DISCORD_EDIT_QUEUE_DEPTH.set_function(lambda: self.depth)
+
+    def _queue_for(self, channel_id: int) -> _ChannelQueue:
+        queue = self._queues.get(channel_id)
+        if queue is None:
+            queue = self._queues[channel_id] = _ChannelQueue(self.rate, self.per)
+        return queue
+
+    async def edit(self, channel, message_id: int, content: str, priority: int = PRIORITY_BACKGROUND) -> str:
+        """Queue an edit and wait for it to reach Discord
+
+        Returns the content actually sent, which is newer than `content` if a later edit to the
+        same message was coalesced with this one. Discord errors (e.g. NotFound) are re-raised.
+        """
+        queue = self._queue_for(channel.id)
+        future = asyncio.get_running_loop().create_future()
+
+        edit = queue.pending.get(message_id)
+        if edit is None:
+            edit = queue.pending[message_id] = _PendingEdit(channel, message_id, content, priority)
+            self.stats['queued'] += 1
+        else:
+            # Still waiting to be sent: only the newest content matters
+            edit.content = content
+            edit.priority = min(edit.priority, priority)
+            self.stats['coalesced'] += 1
+        edit.waiters.append(future)
+
+        if queue.worker is None:
+            queue.worker = asyncio.create_task(self._drain(channel.id, queue))
+
+        return await future
+
+    async def reserve(self, channel_id: int):
+        """Take a token from a channel's bucket for a request made outside the queue (e.g. send)"""
+        queue = self._queue_for(channel_id)
+        await queue.take_token()
+        self._schedule_prune(channel_id, queue)
+
+    def _schedule_prune(self, channel_id: int, queue: _ChannelQueue):
+        """Drop a channel's queue once its bucket has refilled, if nothing was queued meanwhile"""
+        delay = (self.rate - queue.refill()) * self.per / self.rate
+        asyncio.get_running_loop().call_later(delay, self._prune, channel_id, queue)
+
+    def _prune(self, channel_id: int, queue: _ChannelQueue):
+        if self._queues.get(channel_id) is queue and queue.idle:
+            del self._queues[channel_id]
+
+    async def _drain(self, channel_id: int, queue: _ChannelQueue):
+        """Send a channel's pending edits, highest priority then oldest first"""
+        try:
+            while queue.pending:
+                await queue.take_token()
+                if not queue.pending:
+                    break
+
+                edit = min(queue.pending.values(), key=lambda e: (e.priority, e.enqueued_at))
+                del queue.pending[edit.message_id]
+                wait = time.monotonic() - edit.enqueued_at
+                self._wait_times.append(wait)
+                DISCORD_EDIT_WAIT_SECONDS.observe(wait)
+
+                start = time.perf_counter()
+                try:
+                    # Partial messages edit by ID without a fetch_message round trip;
+                    # a missing message still raises discord.NotFound here
+                    await edit.channel.get_partial_message(edit.message_id).edit(content=edit.content)
+                except Exception as e:
+                    DISCORD_EDIT_SECONDS.labels("error").observe(time.perf_counter() - start)
+                    if getattr(e, 'status', None) == 429:
+                        # Not retried by discord.py (e.g. a Cloudflare ban or an over-long retry_after)
+                        DISCORD_RATE_LIMITS.labels("rejected").inc()
+                    self.stats['failed'] += 1
+                    for waiter in edit.waiters:
+                        if not waiter.done():
+                            waiter.set_exception(e)
+                else:
+                    DISCORD_EDIT_SECONDS.labels("ok").observe(time.perf_counter() - start)
+                    self.stats['completed'] += 1
+                    for waiter in edit.waiters:
+                        if not waiter.done():
+                            waiter.set_result(edit.content)
+        finally:
+            queue.worker = None
+            if not queue.pending:
+                self._schedule_prune(channel_id, queue)
+
+    @property
+    def depth(self) -> int:
+        """Edits waiting to be sent across all channels"""
+        return sum(len(queue.pending) for queue in self._queues.values())
+
+    def get_stats(self) -> dict:
+        waits = list(self._wait_times)
+        return {
+            **self.stats,
+            "depth": self.depth,
+            "channels": len(self._queues),
+            "avg_wait": sum(waits) / len(waits) if waits else 0.0,
+            "max_wait": max(waits) if waits else 0.0
+        }
@@ -0,0 +1,132 @@
+"""
+Incremental extraction of the `data` array from CTFd API responses.
+Bytes are fed in as they arrive; each array element is decoded on its own, projected down to the
+fields a tracker needs and then dropped, so peak memory no longer scales with the payload size.
+"""
+
+import codecs
+import json
+import re
+from typing import Any, Callable, List, Optional
+
+_SKIP_WS = re.compile(r"[ \t\n\r]*")
+_SKIP_WS_COMMA = re.compile(r"[ \t\n\r,]*")
+
+
+class StreamingArrayExtractor:
+    """Pull elements of a top-level array field (default `data`) out of a JSON object stream
+
+    `project` maps each decoded element to what should be kept (None drops it); `stop` may end
+    the stream early once a kept value is all that's needed.
+    """
+
+    def __init__(self, project: Callable[[Any], Any] = lambda item: item,
+                 stop: Optional[Callable[[Any], bool]] = None, key: str = "data"):
+        self.project = project
+        self.stop = stop
+        self.key = key
+        self.results: List[Any] = []
+        self.done = False
+
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._pos = 0
+        self._phase = "start"
+        self._eof = False
+
+    def feed(self, chunk: bytes) -> bool:
+        """Consume the next chunk; returns True once no more input is needed"""
+        if self.done:
+            return True
+        self._buf = self._buf[self._pos:] + self._text.decode(chunk)
+        self._pos = 0
+        self._advance()
+        return self.done
+
+    def close(self) -> List[Any]:
+        """Signal end of input and return the kept elements"""
+        if not self.done:
+            self._buf = self._buf[self._pos:] + self._text.decode(b"", final=True)
+            self._pos = 0
+            self._eof = True
+            self._advance()
+        if not self.done:
+            raise ValueError(f"Response ended before the {self.key!r} array was complete")
+        return self.results
+
+    def _skip(self, pattern) -> bool:
+        """Skip whitespace (and commas); False if the buffer ran out"""
+        self._pos = pattern.match(self._buf, self._pos).end()
+        return self._pos < len(self._buf)
+
+    def _decode(self) -> Optional[Any]:
+        """Decode the JSON value at the cursor, or return a sentinel if it isn't complete yet"""
+        try:
+            value, end = self._decoder.raw_decode(self._buf, self._pos)
+        except json.JSONDecodeError:
+            if self._eof:
+                raise
+            return _INCOMPLETE
+        if end == len(self._buf) and not self._eof:
+            return _INCOMPLETE  # A trailing scalar (e.g. a number) may continue in the next chunk
+        self._pos = end
+        return value
+
+    def _advance(self):
+        while not self.done:
+            if self._phase == "start":
+                if not self._skip(_SKIP_WS):
+                    return
+                if self._buf[self._pos] != "{":
+                    raise ValueError("Expected a JSON object")
+                self._pos += 1
+                self._phase = "key"
+
+            elif self._phase == "key":
+                if not self._skip(_SKIP_WS_COMMA):
+                    return
+                if self._buf[self._pos] == "}":
+                    raise ValueError(f"Response has no {self.key!r} field")
+                start = self._pos
+                key = self._decode()
+                if key is _INCOMPLETE or not self._skip(_SKIP_WS):
+                    self._pos = start
+                    return
+                if self._buf[self._pos] != ":":
+                    raise ValueError("Expected ':' after object key")
+                self._pos += 1
+                self._phase = "array" if key == self.key else "skip"
+
+            elif self._phase == "skip":
+                if not self._skip(_SKIP_WS):
+                    return
+                if self._decode() is _INCOMPLETE:
+                    return
+                self._phase = "key"
+
+            elif self._phase == "array":
+                if not self._skip(_SKIP_WS):
+                    return
+                if self._buf[self._pos] != "[":
+                    raise ValueError(f"Expected {self.key!r} to be an array")
+                self._pos += 1
+                self._phase = "items"
+
+            elif self._phase == "items":
+                if not self._skip(_SKIP_WS_COMMA):
+                    return
+                if self._buf[self._pos] == "]":
+                    self.done = True
+                    return
+                item = self._decode()
+                if item is _INCOMPLETE:
+                    return
+                kept = self.project(item)
+                if kept is not None:
+                    self.results.append(kept)
+                    if self.stop is not None and self.stop(kept):
+                        self.done = True
+
+
+_INCOMPLETE = object()
@@ -0,0 +1,208 @@
+"""
+In-memory cache of tracked messages.
+Each message is a slotted TrackedMessage with its metadata parsed into typed fields, plus the
+render state needed to skip unchanged edits. Secondary indexes by guild, channel and CTFd domain
+keep per-scope lookups off the full scan.
+"""
+
+import json
+import logging
+from datetime import datetime
+from functools import lru_cache
+from operator import attrgetter
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Metadata keys held as typed fields, in the order they're serialized back out
+METADATA_FIELDS = (
+    'counter', 'ctfd_domain', 'api_key', 'forum_channel_id', 'team_name', 'team_id',
+    'poll_interval', 'ctf_start', 'ctf_end'
+)
+_METADATA_FIELD_SET = frozenset(METADATA_FIELDS)
+_get_metadata_fields = attrgetter(*METADATA_FIELDS)
+
+
+@lru_cache(maxsize=1024)
+def _parse_iso(value: str) -> Optional[float]:
+    # Trackers for the same CTF share their start/end strings
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        logger.warning(f"Ignoring unparseable timestamp {value!r}")
+        return None
+
+
+def parse_timestamp(value) -> Optional[float]:
+    """Parse a metadata timestamp (unix seconds or ISO 8601) into unix seconds"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    return _parse_iso(str(value))
+
+
+def parse_metadata(metadata) -> dict:
+    """Tracked message metadata may arrive as a JSON string, a dict or None"""
+    if isinstance(metadata, str):
+        try:
+            metadata = json.loads(metadata)
+        except json.JSONDecodeError:
+            return {}
+    return dict(metadata) if isinstance(metadata, dict) else {}
+
+
+class TrackedMessage:
+    """One tracked message: placement, parsed metadata and render state"""
+    __slots__ = (
+        'message_id', 'channel_id', 'guild_id', 'message_type',
+        *METADATA_FIELDS,
+        'start_at', 'end_at',  # ctf_start / ctf_end parsed to unix seconds
+        'extra',  # Unrecognised metadata keys, kept so they survive round trips
+        'digest'  # Digest of the content last sent to Discord
+    )
+
+    def __init__(self, message_id: int, channel_id: int, guild_id: int, message_type: str = 'counter',
+                 metadata: Optional[dict] = None):
+        self.message_id = message_id
+        self.channel_id = channel_id
+        self.guild_id = guild_id
+        self.message_type = message_type or 'counter'
+        self.digest: Optional[bytes] = None
+        self.apply_metadata(metadata or {})
+
+    @classmethod
+    def from_record(cls, record) -> "TrackedMessage":
+        """Build from a tracked_messages row"""
+        return cls(
+            record['message_id'], record['channel_id'], record['guild_id'],
+            record.get('message_type', 'counter'), parse_metadata(record['metadata'])
+        )
+
+    def apply_metadata(self, metadata: dict):
+        """Replace the metadata fields"""
+        get = metadata.get
+        self.counter = get('counter')
+        self.ctfd_domain = get('ctfd_domain')
+        self.api_key = get('api_key')
+        self.forum_channel_id = get('forum_channel_id')
+        self.team_name = get('team_name')
+        self.team_id = get('team_id')
+        self.poll_interval = get('poll_interval')
+        self.ctf_start = get('ctf_start')
+        self.ctf_end = get('ctf_end')
+        self.start_at = parse_timestamp(self.ctf_start) if self.ctf_start is not None else None
+        self.end_at = parse_timestamp(self.ctf_end) if self.ctf_end is not None else None
+        self.extra = None
+        if not _METADATA_FIELD_SET.issuperset(metadata):
+            self.extra = {key: value for key, value in metadata.items() if key not in _METADATA_FIELD_SET}
+
+    @property
+    def metadata(self) -> dict:
+        """Metadata as stored in the database: only the keys that are set"""
+        metadata = {
+            field: value
+            for field, value in zip(METADATA_FIELDS, _get_metadata_fields(self))
+            if value is not None
+        }
+        if self.extra:
+            metadata.update(self.extra)
+        return metadata
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready form sent over IPC"""
+        return {
+            'channel_id': self.channel_id,
+            'guild_id': self.guild_id,
+            'message_type': self.message_type,
+            'metadata': self.metadata
+        }
+
+    def __repr__(self):
+        return f"<TrackedMessage {self.message_id} {self.message_type} channel={self.channel_id}>"
+
+
+def _normalise_domain(ctfd_domain: str) -> str:
+    return ctfd_domain.rstrip('/')
+
+
+class MessageCache:
+    """Tracked messages by ID, with secondary indexes by guild, channel and CTFd domain
+
+    Index buckets are plain lists of IDs: a list costs 8 bytes per entry where a set starts at
+    over 200 bytes per bucket, and buckets are small enough that removal by scan is cheap.
+    """
+
+    def __init__(self):
+        self._messages: Dict[int, TrackedMessage] = {}
+        self._by_guild: Dict[int, List[int]] = {}
+        self._by_channel: Dict[int, List[int]] = {}
+        self._by_domain: Dict[str, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def __contains__(self, message_id) -> bool:
+        return message_id in self._messages
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._messages)
+
+    def get(self, message_id: int) -> Optional[TrackedMessage]:
+        return self._messages.get(message_id)
+
+    def values(self) -> List[TrackedMessage]:
+        return list(self._messages.values())
+
+    def add(self, message: TrackedMessage):
+        """Insert or replace a message"""
+        message_id = message.message_id
+        if message_id in self._messages:
+            self.pop(message_id)
+        self._messages[message_id] = message
+        self._index(self._by_guild, message.guild_id, message_id)
+        self._index(self._by_channel, message.channel_id, message_id)
+        if message.ctfd_domain:
+            self._index(self._by_domain, _normalise_domain(message.ctfd_domain), message_id)
+
+    def pop(self, message_id: int) -> Optional[TrackedMessage]:
+        """Remove a message, returning it if it was cached"""
+        message = self._messages.pop(message_id, None)
+        if message is None:
+            return None
+        self._unindex(self._by_guild, message.guild_id, message_id)
+        self._unindex(self._by_channel, message.channel_id, message_id)
+        if message.ctfd_domain:
+            self._unindex(self._by_domain, _normalise_domain(message.ctfd_domain), message_id)
+        return message
+
+    @staticmethod
+    def _index(index: dict, key, message_id: int):
+        ids = index.get(key)
+        if ids is None:
+            index[key] = [message_id]
+        else:
+            ids.append(message_id)
+
+    @staticmethod
+    def _unindex(index: dict, key, message_id: int):
+        ids = index.get(key)
+        if ids is not None:
+            try:
+                ids.remove(message_id)
+            except ValueError:
+                pass
+            if not ids:
+                del index[key]
+
+    def _lookup(self, index: dict, key) -> List[TrackedMessage]:
+        return [self._messages[message_id] for message_id in index.get(key, ())]
+
+    def in_guild(self, guild_id: int) -> List[TrackedMessage]:
+        return self._lookup(self._by_guild, guild_id)
+
+    def in_channel(self, channel_id: int) -> List[TrackedMessage]:
+        return self._lookup(self._by_channel, channel_id)
+
+    def for_domain(self, ctfd_domain: str) -> List[TrackedMessage]:
+        return self._lookup(self._by_domain, _normalise_domain(ctfd_domain))
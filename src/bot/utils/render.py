@@ -0,0 +1,181 @@
+"""
+CTFd tracker rendering stage.
+Pure functions that take CTFd response bodies (raw, or streamed down to the fields a tracker
+needs) and return the tracker text, so JSON parsing and string building can run in a worker pool
+instead of on the event loop.
+"""
+
+import asyncio
+import json
+import logging
+import multiprocessing
+import re
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from utils.json_stream import StreamingArrayExtractor
+
+try:
+    import orjson
+except ImportError:  # Optional faster decoder
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Hard-coded message template for CTFd tracker
+CTFD_TRACKER_TEMPLATE = """
+```
+==============================
+========== UNSW K17 ==========
+==============================
+* Position:     {position} 
+* Challenges:   {solved_rate}
+
+Solves:
+{solves}
+In-Progress:
+{progress}
+```
+"""
+
+# Team looked up on the scoreboard when a tracker doesn't configure one
+DEFAULT_TEAM_NAME = "K17"
+
+
+class RenderError(ValueError):
+    """Raised when a CTFd payload can't be parsed into a tracker"""
+
+
+def json_loads(raw: bytes):
+    """Decode JSON with orjson when installed, falling back to the stdlib"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def extract_data(raw: bytes):
+    """Return the `data` field of a CTFd API response body"""
+    try:
+        payload = json_loads(raw)
+    except ValueError as e:
+        raise RenderError(f"Invalid JSON from CTFd: {e}")
+    if not isinstance(payload, dict) or 'data' not in payload:
+        raise RenderError("CTFd response has no data")
+    return payload['data']
+
+
+def parse_place(place) -> int:
+    """CTFd reports team place as an ordinal string (e.g. "3rd"); extract the number"""
+    if isinstance(place, int):
+        return place
+    match = re.match(r"\d+", str(place or ""))
+    return int(match.group()) if match else 0
+
+
+def format_tracker(position, solved_challs, total_challenges, progress="") -> str:
+    """Fill the tracker template from the team's standing"""
+    solved_rate=f"{len(solved_challs)}/{total_challenges}"
+
+    solves=""
+    prev_tag = ""
+    # CTFd may send null categories or names; they render as an empty tag/name
+    for challenge in sorted(solved_challs, key = lambda x: x.get('category') or ""):
+        tag = (challenge.get('category') or "").upper()
+        if tag != prev_tag:
+            prev_tag = tag
+            solves += f"\t[{prev_tag}]\n"
+        solves += f"\t\t* {challenge.get('name') or ''}\n"
+
+    return CTFD_TRACKER_TEMPLATE.format(
+        position=position,
+        solved_rate=solved_rate,
+        progress=progress,
+        solves=solves
+    )
+
+
+# Compact challenge record kept from the streamed challenge list: (name, category, solved_by_me)
+ChallengeSummary = Tuple[str, str, bool]
+
+
+def _summarise_challenge(challenge) -> Optional[ChallengeSummary]:
+    if not isinstance(challenge, dict):
+        return None  # Dropped by the extractor
+    return challenge.get("name") or "", challenge.get("category") or "", bool(challenge.get("solved_by_me"))
+
+
+def challenge_summary_extractor() -> StreamingArrayExtractor:
+    """Stream the challenge list keeping only what the tracker shows"""
+    return StreamingArrayExtractor(_summarise_challenge)
+
+
+def team_position_extractor(team_name=DEFAULT_TEAM_NAME, team_id=None) -> StreamingArrayExtractor:
+    """Stream the scoreboard until the team's entry, keeping only its position"""
+    def project(player):
+        if not isinstance(player, dict):
+            return None
+        if (team_id and player.get("account_id") == team_id) or player.get("name") == team_name:
+            return player.get("pos", 0)
+        return None
+    return StreamingArrayExtractor(project, stop=lambda _: True)
+
+
+def render_team_scoped(team_raw: bytes, solves_raw: bytes, total_challenges: int, progress="") -> str:
+    """Render from the team's own record and solves"""
+    team = extract_data(team_raw)
+    if not isinstance(team, dict):
+        raise RenderError("CTFd returned no team")
+    solves = extract_data(solves_raw)
+    if not isinstance(solves, list):
+        raise RenderError("CTFd solves response is not a list")
+    solved_challs = [
+        solve['challenge'] for solve in solves
+        if isinstance(solve, dict) and isinstance(solve.get('challenge'), dict)
+    ]
+    return format_tracker(parse_place(team.get('place')), solved_challs, total_challenges, progress)
+
+
+def render_full_scan(positions: List[int], challenges: List[ChallengeSummary], progress="") -> str:
+    """Render from the streamed scoreboard position and challenge summaries"""
+    position = positions[0] if positions else 0
+    solved_challs = [{"name": name, "category": category} for name, category, solved in challenges if solved]
+    return format_tracker(position, solved_challs, len(challenges), progress)
+
+
+class RenderPool:
+    """Runs render functions off the event loop
+
+    `kind` is "thread" (default), "process" (spawned workers, for very large CTFs) or
+    "inline" (run on the loop; handy for debugging and benchmarks).
+    """
+
+    def __init__(self, workers: int = 2, kind: str = "thread"):
+        self.kind = kind
+        self._executor: Optional[Executor] = None
+        if kind == "process":
+            # Spawn rather than fork: the bot process has live sockets and threads
+            self._executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+        elif kind == "thread":
+            self._executor = ThreadPoolExecutor(workers, thread_name_prefix="render")
+        elif kind != "inline":
+            raise ValueError(f"Unknown render pool kind: {kind}")
+
+    async def run(self, fn, *args):
+        if self._executor is None:
+            return fn(*args)
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def run_local(self, fn, *args):
+        """Like `run`, but for callables holding state between calls (e.g. stream extractors)
+
+        Such callables can't be shipped to a worker process, so the process pool falls back to
+        the loop's default thread executor.
+        """
+        if self.kind == "process":
+            return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+        return await self.run(fn, *args)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
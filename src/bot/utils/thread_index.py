@@ -0,0 +1,100 @@
+"""
+Incremental index of active challenge threads per forum channel.
+Kept up to date from thread gateway events, so rendering a tracker's "In-Progress" section is a
+dictionary lookup instead of a scan-and-sort of every forum thread on every refresh.
+"""
+
+import logging
+from typing import Dict, Optional, Tuple
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+
+def parse_thread_name(name: str) -> Tuple[str, str]:
+    """Split a thread name like "web Cookie Monster" into (category tag, challenge name)"""
+    parsed = name.split(" ")
+    return parsed[0].upper(), " ".join(parsed[1:])
+
+
+def is_in_progress(thread: discord.Thread) -> bool:
+    """Active, unsolved threads are shown as in progress"""
+    return not thread.archived and "SOLVED" not in thread.name.upper()
+
+
+class ForumThreadIndex:
+    """Per-forum index of in-progress threads grouped by category tag"""
+
+    def __init__(self):
+        # {forum_id: {tag: {thread_id: challenge name}}}
+        self._forums: Dict[int, Dict[str, Dict[int, str]]] = {}
+        self._thread_tags: Dict[int, Tuple[int, str]] = {}  # {thread_id: (forum_id, tag)}
+        self._rendered: Dict[int, str] = {}  # Cached "In-Progress" text per forum
+
+    def seed(self, forum: discord.ForumChannel):
+        """(Re)build a forum's entry from its cached active threads"""
+        for thread_id, (forum_id, _) in list(self._thread_tags.items()):
+            if forum_id == forum.id:
+                del self._thread_tags[thread_id]
+        self._forums[forum.id] = {}
+        self._rendered.pop(forum.id, None)
+        for thread in forum.threads:
+            self.upsert(thread)
+        count = sum(len(threads) for threads in self._forums[forum.id].values())
+        logger.debug(f"Indexed {count} in-progress threads in forum {forum.name} ({forum.id})")
+
+    def seed_guild(self, guild: discord.Guild):
+        for channel in guild.channels:
+            if isinstance(channel, discord.ForumChannel):
+                self.seed(channel)
+
+    def upsert(self, thread: discord.Thread):
+        """Apply a created or updated thread"""
+        self.remove(thread.id)
+        if not isinstance(thread.parent, discord.ForumChannel):
+            return  # Moved out of a forum, or the parent isn't cached
+        if not is_in_progress(thread):
+            return
+
+        forum_id = thread.parent.id
+        tags = self._forums.get(forum_id)
+        if tags is None:
+            return  # Forum not seeded yet; seeding will pick this thread up
+
+        tag, name = parse_thread_name(thread.name)
+        tags.setdefault(tag, {})[thread.id] = name
+        self._thread_tags[thread.id] = (forum_id, tag)
+        self._rendered.pop(forum_id, None)
+
+    def remove(self, thread_id: int):
+        """Drop a deleted, archived or solved thread"""
+        entry = self._thread_tags.pop(thread_id, None)
+        if entry is None:
+            return
+        forum_id, tag = entry
+        tags = self._forums.get(forum_id, {})
+        threads = tags.get(tag, {})
+        threads.pop(thread_id, None)
+        if not threads:
+            tags.pop(tag, None)
+        self._rendered.pop(forum_id, None)
+
+    def render(self, forum_channel: Optional[discord.abc.GuildChannel]) -> str:
+        """Return the "In-Progress" section for a forum, seeding it on first use"""
+        if not isinstance(forum_channel, discord.ForumChannel):
+            logger.debug(f"Forum channel issue - Channel: {forum_channel}, Type: {type(forum_channel)}")
+            return ""
+
+        if forum_channel.id not in self._forums:
+            self.seed(forum_channel)
+
+        rendered = self._rendered.get(forum_channel.id)
+        if rendered is None:
+            progress = ""
+            for tag, threads in sorted(self._forums[forum_channel.id].items()):
+                progress += f"\t{tag}\n"
+                for name in sorted(threads.values()):
+                    progress += f"\t\t* {name}\n"
+            rendered = self._rendered[forum_channel.id] = progress
+        return rendered
@@ -0,0 +1,80 @@
+"""
+Write-behind buffer for tracked message metadata.
+Holds the latest metadata per message and flushes dirty rows to the database in one batched
+statement, so per-tick counter updates cost one round trip per flush instead of one per message.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class MetadataWriteBuffer:
+    """Coalesces `tracked_messages.metadata` writes and flushes them periodically"""
+
+    def __init__(self, db, flush_interval: float = 10.0):
+        self.db = db
+        self.flush_interval = flush_interval
+        self._pending: Dict[int, Dict[str, Any]] = {}  # {message_id: latest metadata}
+        self._flushing: Dict[int, Dict[str, Any]] = {}  # Batch currently being written
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def mark(self, message_id: int, metadata: Dict[str, Any]):
+        """Record the latest metadata for a message; only the newest value is written"""
+        self._pending[message_id] = dict(metadata)
+
+    def discard(self, message_id: int):
+        """Drop a pending write, e.g. when the message is deleted or deactivated"""
+        self._pending.pop(message_id, None)
+
+    def is_pending(self, message_id: int) -> bool:
+        """Whether the database may still hold an older value than the cache"""
+        return message_id in self._pending or message_id in self._flushing
+
+    async def flush(self):
+        """Write every dirty row in one batched statement"""
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+            self._flushing = batch
+
+            try:
+                results = await self.db.bulk_update_tracked_message_metadata(batch)
+            except Exception as e:
+                logger.error(f"Failed to flush {len(batch)} metadata writes, will retry: {e}")
+                # Re-queue, without clobbering anything marked while the flush was running
+                for message_id, metadata in batch.items():
+                    self._pending.setdefault(message_id, metadata)
+                return
+            finally:
+                self._flushing = {}
+
+            missing = [mid for mid, updated in results.items() if not updated]
+            if missing:
+                logger.warning(f"Metadata flush skipped {len(missing)} messages no longer in the database: {missing}")
+            logger.debug(f"Flushed metadata for {len(batch)} tracked messages")
+
+    def start(self):
+        """Start the periodic flush loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush loop and write out anything still pending"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
@@ -1,30 +1,127 @@
 import asyncpg
+import base64
 import os
-from typing import Optional, List, Dict, Any
+import time
+import re
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Sequence, Set, Tuple
 import json
 import logging
 
+from shared.metrics import Gauge, Histogram
+
 logger = logging.getLogger(__name__)
 
+DB_ACQUIRE_SECONDS = Histogram(
+    "k17_db_pool_acquire_seconds", "Time spent waiting to check out a pooled database connection"
+)
+DB_CONNECTIONS_IN_USE = Gauge("k17_db_pool_connections_in_use", "Pooled database connections checked out")
+DB_POOL_SIZE = Gauge("k17_db_pool_size", "Open connections in the database pool")
+
+# NOTIFY channel carrying tracked_messages row changes as {op, message_id, feature_type, is_active}
+TRACKED_MESSAGES_CHANNEL = 'tracked_messages_changed'
+
+# audit_logs is range-partitioned by month into audit_logs_y<YYYY>m<MM> tables
+AUDIT_LOG_COLUMNS = ('guild_id', 'user_id', 'action_type', 'details', 'timestamp')
+AUDIT_PARTITION_PATTERN = re.compile(r'^audit_logs_y(\d{4})m(\d{2})$')
+
+def month_start(when: datetime, offset: int = 0) -> datetime:
+    """First instant of the month `offset` months after the one containing `when`"""
+    month = when.year * 12 + when.month - 1 + offset
+    return datetime(month // 12, month % 12 + 1, 1)
+
+def audit_partition_name(when: datetime) -> str:
+    return f"audit_logs_y{when.year:04d}m{when.month:02d}"
+
+# Columns the paginated listings may project (the sort key is always included)
+TRACKED_MESSAGE_FIELDS = (
+    'id', 'message_id', 'channel_id', 'guild_id', 'feature_type', 'message_type',
+    'metadata', 'is_active', 'created_at', 'updated_at'
+)
+AUDIT_LOG_FIELDS = ('id',) + AUDIT_LOG_COLUMNS
+MAX_PAGE_SIZE = 500
+# Sort position of tracked messages with a NULL created_at, matching 'epoch'::timestamp in SQL
+NULL_CREATED_AT = datetime(1970, 1, 1)
+
+def _project(columns: Optional[Sequence[str]], allowed: Sequence[str], sort_key: Sequence[str]) -> str:
+    """Validated SELECT list: the requested columns (default all) plus the sort key"""
+    if columns is None:
+        columns = allowed
+    unknown = set(columns) - set(allowed)
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(sorted(unknown))}")
+    selected = list(dict.fromkeys([*columns, *sort_key]))
+    return ", ".join(selected)
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    """Opaque cursor for the (timestamp, id) position of the last row on a page"""
+    raw = json.dumps([timestamp.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of encode_cursor; raises ValueError for anything it didn't produce"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        timestamp, row_id = json.loads(raw)
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
 ## Manages Connections to Database
 class DatabaseManager:    
     def __init__(self):
         self.pool: Optional[asyncpg.Pool] = None
+        self.backend_pids: Set[int] = set()  # Server PIDs of this process's pooled connections
+    
+    @staticmethod
+    def _connection_params() -> Dict[str, Any]:
+        return {
+            'host': os.getenv('DB_HOST', 'localhost'),
+            'port': int(os.getenv('DB_PORT', 5432)),
+            'user': os.getenv('DB_USER', 'postgres'),
+            'password': os.getenv('DB_PASSWORD'),
+            'database': os.getenv('DB_NAME', 'k17_bot')
+        }
     
     ## Establishes connection to Database
     async def connect(self):
         self.pool = await asyncpg.create_pool(
-            host=os.getenv('DB_HOST', 'localhost'),
-            port=int(os.getenv('DB_PORT', 5432)),
-            user=os.getenv('DB_USER', 'postgres'),
-            password=os.getenv('DB_PASSWORD'),
-            database=os.getenv('DB_NAME', 'k17_bot'),
+            **self._connection_params(),
             min_size=5,
-            max_size=20
+            max_size=20,
+            init=self._track_backend
         )
+        DB_POOL_SIZE.set_function(self.pool.get_size)
         logger.info("✅ Database connection pool established")
         await self._initialize_tables()
     
+    async def _track_backend(self, conn: asyncpg.Connection):
+        """Remember a pooled connection's server PID, so our own NOTIFYs can be told apart"""
+        pid = conn.get_server_pid()
+        self.backend_pids.add(pid)
+        conn.add_termination_listener(lambda _: self.backend_pids.discard(pid))
+    
+    @asynccontextmanager
+    async def _acquire(self):
+        """Check out a pooled connection, recording the wait and how many are in use"""
+        start = time.perf_counter()
+        async with self.pool.acquire() as conn: # type: ignore
+            DB_ACQUIRE_SECONDS.observe(time.perf_counter() - start)
+            DB_CONNECTIONS_IN_USE.inc()
+            try:
+                yield conn
+            finally:
+                DB_CONNECTIONS_IN_USE.dec()
+    
+    ## Opens a dedicated connection for LISTEN (held open, so kept out of the pool)
+    async def connect_listener(self, channel: str, callback) -> asyncpg.Connection:
+        """Open a connection LISTENing on `channel`; `callback(conn, pid, channel, payload)`"""
+        conn = await asyncpg.connect(**self._connection_params())
+        await conn.add_listener(channel, callback)
+        logger.info(f"Listening for database notifications on {channel}")
+        return conn
+    
     ## Closes connection to Database
     async def close(self):
         if self.pool:
@@ -34,7 +131,7 @@ class DatabaseManager:
     ## Initialize database tables
     async def _initialize_tables(self):
         """Create tables if they don't exist"""
-        async with self.pool.acquire() as conn: # type: ignore
+        async with self._acquire() as conn:
             # Tracked messages table - generic for any bot feature
             await conn.execute("""
                 CREATE TABLE IF NOT EXISTS tracked_messages (
@@ -63,29 +160,125 @@ class DatabaseManager:
                 )
             """)
             
-            # Audit logs table
+            # Create indexes
+            await conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_tracked_messages_feature 
+                ON tracked_messages(feature_type, is_active)
+            """)
+            await conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_tracked_messages_guild 
+                ON tracked_messages(guild_id, is_active)
+            """)
+            # Keyset pagination walks this backwards, newest first (created_at is nullable)
+            await conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_tracked_messages_listing
+                ON tracked_messages(feature_type, is_active, (COALESCE(created_at, 'epoch'::timestamp)), message_id)
+            """)
+            # Incremental cache syncs scan rows changed since a watermark
+            await conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_tracked_messages_updated
+                ON tracked_messages(feature_type, updated_at)
+            """)
+            
+            # Publish row changes so the bot's cache follows writes made by any process.
+            # The bot and API both run this at startup; the advisory lock serialises them.
+            async with conn.transaction():
+                await conn.execute("SELECT pg_advisory_xact_lock(hashtext('tracked_messages_notify'))")
+                await conn.execute(f"""
+                    CREATE OR REPLACE FUNCTION notify_tracked_messages_change() RETURNS trigger AS $$
+                    DECLARE
+                        changed tracked_messages;
+                    BEGIN
+                        IF TG_OP = 'DELETE' THEN
+                            changed := OLD;
+                        ELSE
+                            changed := NEW;
+                        END IF;
+                        PERFORM pg_notify('{TRACKED_MESSAGES_CHANNEL}', json_build_object(
+                            'op', TG_OP,
+                            'message_id', changed.message_id,
+                            'feature_type', changed.feature_type,
+                            'is_active', changed.is_active
+                        )::text);
+                        RETURN NULL;
+                    END;
+                    $$ LANGUAGE plpgsql
+                """)
+                await conn.execute("""
+                    CREATE OR REPLACE TRIGGER tracked_messages_notify
+                    AFTER INSERT OR UPDATE OR DELETE ON tracked_messages
+                    FOR EACH ROW EXECUTE FUNCTION notify_tracked_messages_change()
+                """)
+            
+            await self._initialize_audit_logs(conn)
+            
+        logger.info("✅ Database tables initialized")
+    
+    async def _initialize_audit_logs(self, conn: asyncpg.Connection):
+        """Create the month-partitioned audit_logs table, migrating an unpartitioned one"""
+        async with conn.transaction():
+            await conn.execute("SELECT pg_advisory_xact_lock(hashtext('audit_logs_partitions'))")
+            legacy = await conn.fetchval("""
+                SELECT c.relkind = 'r' FROM pg_class c
+                WHERE c.oid = to_regclass('audit_logs')
+            """)
+            if legacy:
+                # Pre-partitioning table: move it aside (with its sequence, whose name we reuse)
+                await conn.execute("ALTER TABLE audit_logs RENAME TO audit_logs_legacy")
+                await conn.execute("ALTER SEQUENCE IF EXISTS audit_logs_id_seq RENAME TO audit_logs_legacy_id_seq")
+                await conn.execute("ALTER INDEX IF EXISTS audit_logs_pkey RENAME TO audit_logs_legacy_pkey")
+            
+            # The partition key has to be part of the primary key
             await conn.execute("""
                 CREATE TABLE IF NOT EXISTS audit_logs (
-                    id SERIAL PRIMARY KEY,
+                    id BIGSERIAL,
                     guild_id BIGINT NOT NULL,
                     user_id BIGINT,
                     action_type VARCHAR(50) NOT NULL,
                     details JSONB,
-                    timestamp TIMESTAMP DEFAULT NOW()
-                )
+                    timestamp TIMESTAMP NOT NULL DEFAULT NOW(),
+                    PRIMARY KEY (id, timestamp)
+                ) PARTITION BY RANGE (timestamp)
             """)
-            
-            # Create indexes
+            # Catches rows outside every monthly partition instead of failing the write
             await conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_tracked_messages_feature 
-                ON tracked_messages(feature_type, is_active)
+                CREATE TABLE IF NOT EXISTS audit_logs_default PARTITION OF audit_logs DEFAULT
             """)
             await conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_tracked_messages_guild 
-                ON tracked_messages(guild_id, is_active)
+                CREATE INDEX IF NOT EXISTS idx_audit_logs_guild_time
+                ON audit_logs(guild_id, timestamp)
             """)
             
-        logger.info("✅ Database tables initialized")
+            if legacy:
+                months = await conn.fetch("""
+                    SELECT DISTINCT date_trunc('month', COALESCE(timestamp, NOW())) AS month
+                    FROM audit_logs_legacy
+                """)
+                for row in months:
+                    await self._create_audit_partition(conn, row['month'])
+                copied = await conn.execute("""
+                    INSERT INTO audit_logs (id, guild_id, user_id, action_type, details, timestamp)
+                    SELECT id, guild_id, user_id, action_type, details, COALESCE(timestamp, NOW())
+                    FROM audit_logs_legacy
+                """)
+                await conn.execute("""
+                    SELECT setval(pg_get_serial_sequence('audit_logs', 'id'),
+                                  GREATEST((SELECT MAX(id) FROM audit_logs), 1))
+                """)
+                await conn.execute("DROP TABLE audit_logs_legacy")
+                logger.info(f"Migrated audit_logs to monthly partitions ({copied})")
+            
+            now = datetime.now()
+            for offset in (0, 1):
+                await self._create_audit_partition(conn, month_start(now, offset))
+    
+    @staticmethod
+    async def _create_audit_partition(conn: asyncpg.Connection, month: datetime):
+        start = month_start(month)
+        await conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {audit_partition_name(start)} PARTITION OF audit_logs
+            FOR VALUES FROM ('{start.isoformat()}') TO ('{month_start(start, 1).isoformat()}')
+        """)
     
     ## ==================== TRACKED MESSAGES ====================
     async def add_tracked_message(
@@ -109,7 +302,7 @@ class DatabaseManager:
                 updated_at = NOW()
             RETURNING id
         """
-        async with self.pool.acquire() as conn: # type: ignore
+        async with self._acquire() as conn:
             row = await conn.fetchrow(
                 query, message_id, channel_id, guild_id, 
                 feature_type, message_type, json.dumps(metadata) if metadata else None
@@ -117,6 +310,46 @@ class DatabaseManager:
             logger.info(f"Tracked message {message_id} for {feature_type} (type: {message_type})")
             return row['id'] # type: ignore
     
+    async def bulk_add_tracked_messages(
+        self,
+        messages: List[Dict[str, Any]]
+    ) -> Dict[int, str]:
+        """Upsert many tracked messages in one statement
+
+        Each item takes the same fields as add_tracked_message. Returns
+        {message_id: 'inserted' | 'updated'}; later duplicates in the batch win.
+        """
+        # ON CONFLICT can't touch the same row twice in one statement, so dedupe first
+        by_id = {msg['message_id']: msg for msg in messages}
+        if not by_id:
+            return {}
+        rows = list(by_id.values())
+        query = """
+            INSERT INTO tracked_messages
+            (message_id, channel_id, guild_id, feature_type, message_type, metadata)
+            SELECT u.message_id, u.channel_id, u.guild_id, u.feature_type, u.message_type, u.metadata::jsonb
+            FROM unnest($1::bigint[], $2::bigint[], $3::bigint[], $4::text[], $5::text[], $6::text[])
+                AS u(message_id, channel_id, guild_id, feature_type, message_type, metadata)
+            ON CONFLICT (message_id)
+            DO UPDATE SET
+                metadata = EXCLUDED.metadata,
+                message_type = EXCLUDED.message_type,
+                updated_at = NOW()
+            RETURNING message_id, (xmax = 0) AS inserted
+        """
+        async with self._acquire() as conn:
+            result = await conn.fetch(
+                query,
+                [r['message_id'] for r in rows],
+                [r['channel_id'] for r in rows],
+                [r['guild_id'] for r in rows],
+                [r['feature_type'] for r in rows],
+                [r.get('message_type', 'counter') for r in rows],
+                [json.dumps(r['metadata']) if r.get('metadata') else None for r in rows]
+            )
+        logger.info(f"Bulk tracked {len(result)} messages")
+        return {row['message_id']: 'inserted' if row['inserted'] else 'updated' for row in result}
+    
     async def get_tracked_messages(
         self, 
         feature_type: Optional[str] = None,
@@ -143,9 +376,104 @@ class DatabaseManager:
             ORDER BY created_at DESC
         """
         
-        async with self.pool.acquire() as conn: # type: ignore
+        async with self._acquire() as conn:
+            return await conn.fetch(query, *params)
+    
+    async def get_tracked_messages_page(
+        self,
+        feature_type: Optional[str] = None,
+        guild_id: Optional[int] = None,
+        is_active: bool = True,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        columns: Optional[Sequence[str]] = None
+    ) -> Tuple[List[asyncpg.Record], Optional[str]]:
+        """One page of tracked messages, newest first
+
+        Pass the returned cursor back to get the next page; it is None on the last page.
+        `limit` is clamped to 1..MAX_PAGE_SIZE. Rows without a created_at come last. `columns` limits the fields fetched (e.g. leave out metadata); created_at and
+        message_id are always included. Raises ValueError for unknown columns or a bad cursor.
+        """
+        select = _project(columns, TRACKED_MESSAGE_FIELDS, ('created_at', 'message_id'))
+        conditions = ["is_active = $1"]
+        params: List[Any] = [is_active]
+        
+        if feature_type:
+            params.append(feature_type)
+            conditions.append(f"feature_type = ${len(params)}")
+        
+        if guild_id:
+            params.append(guild_id)
+            conditions.append(f"guild_id = ${len(params)}")
+        
+        # NULL created_at sorts as the epoch, i.e. last; the expression matches the listing index
+        created = "COALESCE(created_at, 'epoch'::timestamp)"
+        if cursor:
+            created_at, message_id = decode_cursor(cursor)
+            params.extend([created_at, message_id])
+            # The plain bound lets the index range-scan; the row comparison breaks timestamp ties
+            conditions.append(
+                f"{created} <= ${len(params) - 1} AND ({created}, message_id) < (${len(params) - 1}, ${len(params)})"
+            )
+        
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        params.append(limit + 1)  # One extra row tells us whether there is a next page
+        query = f"""
+            SELECT {select} FROM tracked_messages
+            WHERE {' AND '.join(conditions)}
+            ORDER BY {created} DESC, message_id DESC
+            LIMIT ${len(params)}
+        """
+        
+        async with self._acquire() as conn:
+            rows = await conn.fetch(query, *params)
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        last = rows[-1]
+        return rows, encode_cursor(last['created_at'] or NULL_CREATED_AT, last['message_id'])
+    
+    async def get_tracked_messages_changed_since(
+        self,
+        feature_type: str,
+        since: Optional[datetime] = None
+    ) -> List[asyncpg.Record]:
+        """Get rows of a feature updated at or after `since`, oldest first
+
+        Inactive rows are included so callers can evict deactivated messages.
+        Without `since`, every row of the feature is returned.
+        """
+        if since is None:
+            query = """
+                SELECT * FROM tracked_messages
+                WHERE feature_type = $1
+                ORDER BY updated_at
+            """
+            params: List[Any] = [feature_type]
+        else:
+            query = """
+                SELECT * FROM tracked_messages
+                WHERE feature_type = $1 AND updated_at >= $2
+                ORDER BY updated_at
+            """
+            params = [feature_type, since]
+        
+        async with self._acquire() as conn:
             return await conn.fetch(query, *params)
     
+    async def get_tracked_message(self, message_id: int) -> Optional[asyncpg.Record]:
+        """Get a single tracked message by ID using the UNIQUE(message_id) index
+
+        The query text is constant, so asyncpg's per-connection statement cache
+        prepares it once and reuses the plan on every later call.
+        """
+        query = """
+            SELECT * FROM tracked_messages
+            WHERE message_id = $1
+        """
+        async with self._acquire() as conn:
+            return await conn.fetchrow(query, message_id)
+    
     async def update_tracked_message_metadata(
         self,
         message_id: int,
@@ -157,9 +485,34 @@ class DatabaseManager:
             SET metadata = $2, updated_at = NOW()
             WHERE message_id = $1
         """
-        async with self.pool.acquire() as conn: # type: ignore
+        async with self._acquire() as conn:
             await conn.execute(query, message_id, json.dumps(metadata))
     
+    async def bulk_update_tracked_message_metadata(
+        self,
+        updates: Dict[int, Dict[str, Any]]
+    ) -> Dict[int, bool]:
+        """Update metadata for many tracked messages in one statement
+
+        Returns {message_id: updated} so callers can see which rows no longer exist.
+        """
+        if not updates:
+            return {}
+        query = """
+            UPDATE tracked_messages AS tm
+            SET metadata = u.metadata::jsonb, updated_at = NOW()
+            FROM unnest($1::bigint[], $2::text[]) AS u(message_id, metadata)
+            WHERE tm.message_id = u.message_id
+            RETURNING tm.message_id
+        """
+        message_ids = list(updates.keys())
+        async with self._acquire() as conn:
+            rows = await conn.fetch(
+                query, message_ids, [json.dumps(updates[mid]) for mid in message_ids]
+            )
+        updated = {row['message_id'] for row in rows}
+        return {mid: mid in updated for mid in message_ids}
+    
     async def deactivate_tracked_message(self, message_id: int):
         """Mark a tracked message as inactive"""
         query = """
@@ -167,7 +520,7 @@ class DatabaseManager:
             SET is_active = false, updated_at = NOW()
             WHERE message_id = $1
         """
-        async with self.pool.acquire() as conn: # type: ignore
+        async with self._acquire() as conn:
             await conn.execute(query, message_id)
             logger.info(f"Deactivated tracked message {message_id}")
     
@@ -177,11 +530,42 @@ class DatabaseManager:
             DELETE FROM tracked_messages
             WHERE message_id = $1
         """
-        async with self.pool.acquire() as conn: # type: ignore
+        async with self._acquire() as conn:
             result = await conn.execute(query, message_id)
             logger.info(f"Deleted tracked message {message_id}")
             return result
 
+    async def bulk_deactivate_tracked_messages(self, message_ids: List[int]) -> Dict[int, bool]:
+        """Mark many tracked messages as inactive; returns {message_id: found}"""
+        if not message_ids:
+            return {}
+        query = """
+            UPDATE tracked_messages
+            SET is_active = false, updated_at = NOW()
+            WHERE message_id = ANY($1::bigint[])
+            RETURNING message_id
+        """
+        async with self._acquire() as conn:
+            rows = await conn.fetch(query, message_ids)
+        found = {row['message_id'] for row in rows}
+        logger.info(f"Deactivated {len(found)}/{len(message_ids)} tracked messages")
+        return {mid: mid in found for mid in message_ids}
+    
+    async def bulk_delete_tracked_messages(self, message_ids: List[int]) -> Dict[int, bool]:
+        """Permanently delete many tracked messages; returns {message_id: found}"""
+        if not message_ids:
+            return {}
+        query = """
+            DELETE FROM tracked_messages
+            WHERE message_id = ANY($1::bigint[])
+            RETURNING message_id
+        """
+        async with self._acquire() as conn:
+            rows = await conn.fetch(query, message_ids)
+        found = {row['message_id'] for row in rows}
+        logger.info(f"Deleted {len(found)}/{len(message_ids)} tracked messages")
+        return {mid: mid in found for mid in message_ids}
+
     ## ==================== REACTION ROLES ====================
     ## TODO
     async def add_reaction_role(
@@ -199,7 +583,7 @@ class DatabaseManager:
             ON CONFLICT (message_id, emoji) 
             DO UPDATE SET role_id = $3, mode = $4
         """
-        async with self.pool.acquire() as conn: # type: ignore
+        async with self._acquire() as conn:
             await conn.execute(query, message_id, emoji, role_id, mode)
             logger.info(f"Added reaction role {emoji} -> {role_id} on message {message_id}")
     
@@ -211,7 +595,7 @@ class DatabaseManager:
             JOIN tracked_messages tm ON rrc.message_id = tm.message_id
             WHERE rrc.message_id = $1 AND tm.is_active = true
         """
-        async with self.pool.acquire() as conn: # type: ignore
+        async with self._acquire() as conn:
             return await conn.fetch(query, message_id)
     
     async def get_all_reaction_role_messages(self) -> List[asyncpg.Record]:
@@ -233,10 +617,52 @@ class DatabaseManager:
             WHERE tm.feature_type = 'reaction_roles' AND tm.is_active = true
             GROUP BY tm.message_id, tm.channel_id, tm.guild_id
         """
-        async with self.pool.acquire() as conn: # type: ignore
+        async with self._acquire() as conn:
             return await conn.fetch(query)
     
     ## ==================== AUDIT LOGS ====================
+    async def copy_audit_logs(self, records: Sequence[Tuple[Any, ...]]) -> int:
+        """Bulk-insert audit rows with COPY
+
+        Each record is (guild_id, user_id, action_type, details JSON text, timestamp), as
+        AUDIT_LOG_COLUMNS. Returns the number of rows written.
+        """
+        if not records:
+            return 0
+        async with self._acquire() as conn:
+            await conn.copy_records_to_table('audit_logs', records=records, columns=AUDIT_LOG_COLUMNS)
+        return len(records)
+    
+    async def ensure_audit_partitions(self, when: Optional[datetime] = None, months_ahead: int = 1):
+        """Create the monthly partitions from `when` (default now) up to `months_ahead` later"""
+        when = when or datetime.now()
+        async with self._acquire() as conn:
+            async with conn.transaction():
+                await conn.execute("SELECT pg_advisory_xact_lock(hashtext('audit_logs_partitions'))")
+                for offset in range(months_ahead + 1):
+                    await self._create_audit_partition(conn, month_start(when, offset))
+    
+    async def drop_audit_partitions_before(self, cutoff: datetime) -> List[str]:
+        """Drop monthly partitions that end on or before `cutoff`; returns the dropped names"""
+        async with self._acquire() as conn:
+            names = await conn.fetch("""
+                SELECT c.relname FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = 'audit_logs'::regclass
+            """)
+            dropped = []
+            for row in names:
+                match = AUDIT_PARTITION_PATTERN.match(row['relname'])
+                if not match:
+                    continue
+                month_end = month_start(datetime(int(match[1]), int(match[2]), 1), 1)
+                if month_end <= cutoff:
+                    await conn.execute(f"DROP TABLE IF EXISTS {row['relname']}")
+                    dropped.append(row['relname'])
+        if dropped:
+            logger.info(f"Dropped audit log partitions: {', '.join(dropped)}")
+        return dropped
+    
     async def log_action(
         self, 
         guild_id: int, 
@@ -249,7 +675,7 @@ class DatabaseManager:
             INSERT INTO audit_logs (guild_id, user_id, action_type, details, timestamp)
             VALUES ($1, $2, $3, $4, NOW())
         """
-        async with self.pool.acquire() as conn: # type: ignore
+        async with self._acquire() as conn:
             await conn.execute(
                 query, 
                 guild_id, 
@@ -282,5 +708,52 @@ class DatabaseManager:
             """
             params = [guild_id, limit]
         
-        async with self.pool.acquire() as conn: # type: ignore
-            return await conn.fetch(query, *params)
\ No newline at end of file
+        async with self._acquire() as conn:
+            return await conn.fetch(query, *params)
+    
+    async def get_audit_logs_page(
+        self,
+        guild_id: int,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        action_type: Optional[str] = None,
+        columns: Optional[Sequence[str]] = None
+    ) -> Tuple[List[asyncpg.Record], Optional[str]]:
+        """One page of a guild's audit logs, newest first
+
+        Walks idx_audit_logs_guild_time from the cursor instead of skipping rows, so every page
+        costs the same. Returns (rows, next cursor or None). `limit` is clamped to
+        1..MAX_PAGE_SIZE; timestamp and id are always selected. Raises ValueError for unknown columns or a bad cursor.
+        """
+        select = _project(columns, AUDIT_LOG_FIELDS, ('timestamp', 'id'))
+        conditions = ["guild_id = $1"]
+        params: List[Any] = [guild_id]
+        
+        if action_type:
+            params.append(action_type)
+            conditions.append(f"action_type = ${len(params)}")
+        
+        if cursor:
+            timestamp, row_id = decode_cursor(cursor)
+            params.extend([timestamp, row_id])
+            # The plain bound lets the index range-scan (and prunes newer partitions);
+            # the row comparison breaks timestamp ties
+            conditions.append(
+                f"timestamp <= ${len(params) - 1} AND (timestamp, id) < (${len(params) - 1}, ${len(params)})"
+            )
+        
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        params.append(limit + 1)  # One extra row tells us whether there is a next page
+        query = f"""
+            SELECT {select} FROM audit_logs
+            WHERE {' AND '.join(conditions)}
+            ORDER BY timestamp DESC, id DESC
+            LIMIT ${len(params)}
+        """
+        
+        async with self._acquire() as conn:
+            rows = await conn.fetch(query, *params)
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1]['timestamp'], rows[-1]['id'])
\ No newline at end of file
@@ -1,25 +1,83 @@
 """
 IPC (Inter-Process Communication) module for bot-to-API communication.
 Uses Unix domain sockets for fast, local communication between the bot and web API.
+
+Wire format: every message is a frame of a 4-byte big-endian length followed by that many
+bytes of UTF-8 JSON. Requests carry an "id" that is echoed in the response, so one
+long-lived connection can carry many concurrent requests.
 """
 
 import asyncio
+import itertools
 import json
 import logging
 import os
-from typing import Any, Dict, Optional
+import struct
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
 from pathlib import Path
 
+from shared.metrics import REGISTRY, Counter, Histogram
+from shared import profiler
+
 logger = logging.getLogger(__name__)
 
-SOCKET_PATH = "/tmp/ipc/k17_bot_ipc.sock"
+SOCKET_PATH = os.getenv("IPC_SOCKET_PATH", "/tmp/ipc/k17_bot_ipc.sock")
+
+FRAME_HEADER = struct.Struct(">I")
+MAX_FRAME_SIZE = 64 * 1024 * 1024  # Guard against corrupt length prefixes
+MAX_SUBSCRIBER_BUFFER = 1024 * 1024  # Drop event subscribers that stop reading
+
+# Known actions; anything else is labelled "unknown" so clients can't grow the label set
+IPC_ACTIONS = frozenset({
+    "subscribe", "get_cache", "get_cache_message", "get_stats", "get_metrics", "profile", "update_counter",
+    "trigger_update", "reload_cache", "create_message", "delete_message"
+})
+
+IPC_REQUEST_SECONDS = Histogram(
+    "k17_ipc_request_seconds", "Time the bot spends handling an IPC request", ("action",)
+)
+IPC_REQUEST_ERRORS = Counter("k17_ipc_request_errors", "IPC requests answered with an error", ("action",))
+IPC_CLIENT_SECONDS = Histogram(
+    "k17_ipc_client_seconds", "IPC round trip as seen by the web API", ("action",)
+)
+
+def _action_label(action: Any) -> str:
+    return action if action in IPC_ACTIONS else "unknown"
+
+class IPCProtocolError(Exception):
+    """Raised when a peer sends a malformed frame"""
+
+async def read_frame(reader: asyncio.StreamReader) -> Optional[Dict[str, Any]]:
+    """Read one length-prefixed JSON frame, or None on a clean EOF"""
+    try:
+        header = await reader.readexactly(FRAME_HEADER.size)
+    except asyncio.IncompleteReadError as e:
+        if e.partial:
+            raise IPCProtocolError("Connection closed mid-header")
+        return None
+    
+    (length,) = FRAME_HEADER.unpack(header)
+    if length > MAX_FRAME_SIZE:
+        raise IPCProtocolError(f"Frame of {length} bytes exceeds limit")
+    
+    body = await reader.readexactly(length)
+    return json.loads(body)
+
+def encode_frame(payload: Dict[str, Any]) -> bytes:
+    """Encode a payload as a length-prefixed JSON frame"""
+    body = json.dumps(payload).encode()
+    return FRAME_HEADER.pack(len(body)) + body
 
 class IPCServer:
     """IPC Server that runs in the bot process"""
     
-    def __init__(self, ctf_manager):
+    def __init__(self, ctf_manager, audit=None):
         self.ctf_manager = ctf_manager
+        self.audit = audit  # Optional AuditLogWriter recording operator actions
         self.server: Optional[asyncio.Server] = None
+        self._subscribers: Set[asyncio.StreamWriter] = set()  # Connections receiving pushed events
+        ctf_manager.add_event_listener(self._broadcast)
         
     async def start(self):
         """Start the IPC server"""
@@ -47,37 +105,112 @@ class IPCServer:
             logger.info("IPC Server stopped")
     
     async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
-        """Handle incoming IPC requests"""
+        """Serve framed requests on a persistent connection until the client disconnects"""
+        write_lock = asyncio.Lock()
+        pending = set()
+        
         try:
-            data = await reader.read(4096)
-            if not data:
-                return
-            
-            request = json.loads(data.decode())
-            logger.debug(f"IPC Request: {request}")
-            
-            response = await self._process_request(request)
-            
-            writer.write(json.dumps(response).encode())
-            await writer.drain()
-            
+            while True:
+                request = await read_frame(reader)
+                if request is None:
+                    break
+                if not isinstance(request, dict):
+                    # Valid JSON but not a request object; there's no id to echo back
+                    logger.warning(f"Ignoring IPC frame that is not an object: {type(request).__name__}")
+                    async with write_lock:
+                        writer.write(encode_frame({"id": None, "status": "error", "message": "Request must be a JSON object"}))
+                        await writer.drain()
+                    continue
+                
+                # Handle each request concurrently; responses are matched by id, not order
+                task = asyncio.create_task(self._respond(request, writer, write_lock))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+        except (IPCProtocolError, json.JSONDecodeError, asyncio.IncompleteReadError) as e:
+            logger.error(f"IPC protocol error, dropping connection: {e}")
+        except ConnectionError:
+            pass
+        finally:
+            self._subscribers.discard(writer)
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+    
+    def _audit(self, guild_id: Optional[int], action_type: str, details: Dict[str, Any]):
+        """Queue an audit entry for an operator action (never waits on the database)"""
+        if self.audit is not None and guild_id is not None:
+            self.audit.log(guild_id, action_type, {"source": "ipc", **details})
+    
+    def _guild_of(self, message_id) -> Optional[int]:
+        tracked = self.ctf_manager.get_tracked(message_id) if message_id is not None else None
+        return tracked.guild_id if tracked is not None else None
+    
+    def _broadcast(self, event: Dict[str, Any]):
+        """Push a cache change event to every subscribed connection"""
+        if not self._subscribers:
+            return
+        frame = encode_frame({"event": event})
+        for writer in list(self._subscribers):
+            if writer.is_closing() or writer.transport.get_write_buffer_size() > MAX_SUBSCRIBER_BUFFER:
+                logger.warning("Dropping slow or closed IPC event subscriber")
+                self._subscribers.discard(writer)
+                writer.close()
+                continue
+            # A single write() call never interleaves with another frame, so no lock is needed
+            writer.write(frame)
+    
+    async def _respond(self, request: Dict[str, Any], writer: asyncio.StreamWriter, write_lock: asyncio.Lock):
+        """Process one request and write its response frame"""
+        request_id = request.pop("id", None)
+        logger.debug(f"IPC Request {request_id}: {request}")
+        action = _action_label(request.get("action"))
+        start = time.perf_counter()
+        
+        try:
+            if request.get("action") == "subscribe":
+                # The connection now also receives {"event": ...} frames until it closes
+                self._subscribers.add(writer)
+                response = {"status": "success", "message": "Subscribed to cache events"}
+            else:
+                response = await self._process_request(request)
         except Exception as e:
             logger.error(f"IPC Error: {e}")
-            error_response = {"status": "error", "message": str(e)}
-            writer.write(json.dumps(error_response).encode())
+            response = {"status": "error", "message": str(e)}
+        
+        IPC_REQUEST_SECONDS.labels(action).observe(time.perf_counter() - start)
+        if response.get("status") == "error":
+            IPC_REQUEST_ERRORS.labels(action).inc()
+        
+        response["id"] = request_id
+        async with write_lock:
+            writer.write(encode_frame(response))
             await writer.drain()
-        finally:
-            writer.close()
-            await writer.wait_closed()
     
     async def _process_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """Process IPC request and return response"""
         action = request.get("action")
         
         if action == "get_cache":
+            version = self.ctf_manager.cache_version
+            if request.get("if_version") == version:
+                return {"status": "not_modified", "version": version}
+            
+            # Deltas cover the whole cache, so scoped (filtered) requests always get a full listing
+            scope = {key: request.get(key) for key in ("guild_id", "channel_id", "ctfd_domain")}
+            since = request.get("since")
+            if since is not None and not any(value is not None for value in scope.values()):
+                delta = self.ctf_manager.get_cache_delta(since)
+                if delta is not None:
+                    return {"status": "success", "version": version, "delta": True, **delta}
+            
             return {
                 "status": "success",
-                "data": self.ctf_manager.get_cache()
+                "version": version,
+                "data": self.ctf_manager.get_cache(**scope)
             }
         
         elif action == "get_cache_message":
@@ -87,10 +220,39 @@ class IPCServer:
                 return {"status": "success", "data": data}
             return {"status": "error", "message": "Message not found in cache"}
         
+        elif action == "get_stats":
+            return {
+                "status": "success",
+                "data": {
+                    "edits": self.ctf_manager.get_edit_stats(),
+                    "edit_queue": self.ctf_manager.edits.get_stats(),
+                    "ctfd_cache": dict(self.ctf_manager.ctfd.cache_stats)
+                }
+            }
+        
+        elif action == "get_metrics":
+            return {"status": "success", "data": REGISTRY.collect({"process": "bot"})}
+        
+        elif action == "profile":
+            try:
+                data = await profiler.capture(
+                    seconds=float(request.get("seconds", 10)),
+                    mode=request.get("mode", "sample"),
+                    interval=float(request.get("interval", 0.005)),
+                    slow_callback_ms=float(request.get("slow_callback_ms", 100)),
+                    limit=int(request.get("limit", 50)),
+                    raw=bool(request.get("raw"))
+                )
+            except (ValueError, profiler.ProfilerBusyError) as e:
+                return {"status": "error", "message": str(e)}
+            return {"status": "success", "data": data}
+        
         elif action == "update_counter":
             message_id = request.get("message_id")
             value = request.get("value")
             success = await self.ctf_manager.update_counter(message_id, value)
+            self._audit(self._guild_of(message_id), "update_counter",
+                        {"message_id": message_id, "value": value, "success": success})
             if success:
                 return {"status": "success"}
             return {"status": "error", "message": "Failed to update counter"}
@@ -100,8 +262,8 @@ class IPCServer:
             return {"status": "success", "message": "Leaderboards updated"}
         
         elif action == "reload_cache":
-            await self.ctf_manager.initialize()
-            return {"status": "success", "message": "Cache reloaded from database"}
+            result = await self.ctf_manager.reload_cache(full=bool(request.get("full")))
+            return {"status": "success", "message": "Cache reloaded from database", "data": result}
         
         elif action == "create_message":
             channel_id = request.get("channel_id")
@@ -110,10 +272,21 @@ class IPCServer:
             ctfd_domain = request.get("ctfd_domain")
             ctfd_api_key = request.get("ctfd_api_key")
             forum_channel_id = request.get("forum_channel_id", 0)
+            team_name = request.get("team_name") or ""
+            team_id = request.get("team_id", 0)
+            poll_interval = request.get("poll_interval", 0)
+            ctf_start = request.get("ctf_start") or ""
+            ctf_end = request.get("ctf_end") or ""
             
             result = await self.ctf_manager.create_tracked_message(
-                channel_id, message_type, initial_counter, ctfd_domain, ctfd_api_key, forum_channel_id
+                channel_id, message_type, initial_counter, ctfd_domain, ctfd_api_key, forum_channel_id,
+                team_name, team_id, poll_interval, ctf_start, ctf_end
             )
+            # The API key stays out of the audit trail
+            self._audit(result.get("guild_id"), "create_message", {
+                "message_id": result.get("message_id"), "channel_id": channel_id, "message_type": message_type,
+                "ctfd_domain": ctfd_domain, "team_name": team_name, "success": bool(result.get("success"))
+            })
             if result.get("success"):
                 return {"status": "success", "data": result}
             return {"status": "error", "message": result.get("error", "Failed to create message")}
@@ -121,10 +294,15 @@ class IPCServer:
         elif action == "delete_message":
             message_id = request.get("message_id")
             delete_discord = request.get("delete_discord_message", True)
+            guild_id = self._guild_of(message_id)  # Gone from the cache once deleted
             
             result = await self.ctf_manager.delete_tracked_message(
                 message_id, delete_discord
             )
+            self._audit(guild_id, "delete_message", {
+                "message_id": message_id, "delete_discord_message": delete_discord,
+                "success": bool(result.get("success"))
+            })
             if result.get("success"):
                 return {"status": "success", "message": result.get("message")}
             return {"status": "error", "message": result.get("error", "Failed to delete message")}
@@ -133,30 +311,147 @@ class IPCServer:
             return {"status": "error", "message": f"Unknown action: {action}"}
 
 
-class IPCClient:
-    """IPC Client for the web API to communicate with the bot"""
+class _IPCConnection:
+    """One long-lived connection to the bot, multiplexing requests by id"""
     
-    @staticmethod
-    async def send_request(action: str, **kwargs) -> Dict[str, Any]:
-        """Send a request to the IPC server"""
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self._ids = itertools.count(1)
+        self._waiters: Dict[int, asyncio.Future] = {}
+        self._write_lock = asyncio.Lock()
+        self._reader_task = asyncio.create_task(self._read_loop())
+    
+    @property
+    def closed(self) -> bool:
+        return self._reader_task.done()
+    
+    @property
+    def in_flight(self) -> int:
+        return len(self._waiters)
+    
+    async def request(self, payload: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._waiters[request_id] = future
+        
         try:
-            reader, writer = await asyncio.open_unix_connection(SOCKET_PATH)
-            
-            request = {"action": action, **kwargs}
-            writer.write(json.dumps(request).encode())
-            await writer.drain()
+            async with self._write_lock:
+                self.writer.write(encode_frame({**payload, "id": request_id}))
+                await self.writer.drain()
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._waiters.pop(request_id, None)
+    
+    async def _read_loop(self):
+        """Route response frames to the request waiting on their id"""
+        error: Exception = ConnectionError("IPC connection closed")
+        try:
+            while True:
+                response = await read_frame(self.reader)
+                if response is None:
+                    break
+                future = self._waiters.get(response.pop("id", None))
+                if future is not None and not future.done():
+                    future.set_result(response)
+        except Exception as e:
+            error = e
+        finally:
+            for future in self._waiters.values():
+                if not future.done():
+                    future.set_exception(error)
+            self.writer.close()
+    
+    async def close(self):
+        self._reader_task.cancel()
+        try:
+            await self._reader_task
+        except asyncio.CancelledError:
+            pass
+
+
+class IPCClient:
+    """IPC Client for the web API to communicate with the bot
+    
+    Keeps a small pool of persistent connections and spreads requests over them.
+    """
+    
+    POOL_SIZE = 4
+    REQUEST_TIMEOUT = 30.0
+    
+    _connections: List[_IPCConnection] = []
+    _connect_lock: Optional[asyncio.Lock] = None
+    
+    @classmethod
+    async def _get_connection(cls) -> _IPCConnection:
+        """Pick the least busy live connection, opening new ones up to the pool size"""
+        if cls._connect_lock is None:
+            cls._connect_lock = asyncio.Lock()
+        
+        async with cls._connect_lock:
+            cls._connections = [conn for conn in cls._connections if not conn.closed]
             
-            data = await reader.read(4096)
-            response = json.loads(data.decode())
+            idle = [conn for conn in cls._connections if conn.in_flight == 0]
+            if idle:
+                return idle[0]
             
-            writer.close()
-            await writer.wait_closed()
+            if len(cls._connections) < cls.POOL_SIZE:
+                reader, writer = await asyncio.open_unix_connection(SOCKET_PATH)
+                conn = _IPCConnection(reader, writer)
+                cls._connections.append(conn)
+                return conn
             
+            return min(cls._connections, key=lambda conn: conn.in_flight)
+    
+    @classmethod
+    async def send_request(cls, action: str, timeout: Optional[float] = None, **kwargs) -> Dict[str, Any]:
+        """Send a request to the IPC server, waiting up to `timeout` (default REQUEST_TIMEOUT) seconds"""
+        start = time.perf_counter()
+        try:
+            conn = await cls._get_connection()
+            response = await conn.request({"action": action, **kwargs}, timeout or cls.REQUEST_TIMEOUT)
+            IPC_CLIENT_SECONDS.labels(_action_label(action)).observe(time.perf_counter() - start)
             return response
             
-        except FileNotFoundError:
+        except (FileNotFoundError, ConnectionRefusedError):
             logger.error("IPC socket not found. Is the bot running?")
             return {"status": "error", "message": "Bot is not running or IPC not available"}
+        except asyncio.TimeoutError:
+            logger.error(f"IPC request {action} timed out")
+            return {"status": "error", "message": f"IPC request {action} timed out"}
         except Exception as e:
             logger.error(f"IPC Client Error: {e}")
             return {"status": "error", "message": str(e)}
+    
+    @staticmethod
+    async def subscribe() -> AsyncIterator[Dict[str, Any]]:
+        """Yield cache change events pushed by the bot over a dedicated connection
+        
+        The first item is {"type": "subscribed"}, yielded once the bot acknowledges the
+        subscription, so callers know the bot is up before any cache event arrives.
+        Raises ConnectionError (or FileNotFoundError) when the bot goes away.
+        """
+        reader, writer = await asyncio.open_unix_connection(SOCKET_PATH)
+        try:
+            writer.write(encode_frame({"action": "subscribe", "id": 0}))
+            await writer.drain()
+            
+            while True:
+                frame = await read_frame(reader)
+                if frame is None:
+                    raise ConnectionError("IPC event stream closed")
+                if "event" in frame:
+                    yield frame["event"]
+                elif frame.get("status") == "success":
+                    yield {"type": "subscribed"}
+                elif frame.get("status") == "error":
+                    raise ConnectionError(frame.get("message", "Subscription rejected"))
+        finally:
+            writer.close()
+    
+    @classmethod
+    async def close(cls):
+        """Close every pooled connection"""
+        for conn in cls._connections:
+            await conn.close()
+        cls._connections = []
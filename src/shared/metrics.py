@@ -0,0 +1,239 @@
+"""
+Low-overhead in-process metrics with Prometheus text exposition.
+Counters, gauges and histograms live in a process-wide registry; the bot ships its samples to
+the web API over IPC, which merges them with its own and serves them on /metrics.
+"""
+
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from sub-millisecond IPC calls to slow CTFd responses
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Payload size buckets in bytes, 1 KiB to 64 MiB
+SIZE_BUCKETS = tuple(1024 * 4 ** i for i in range(9))
+
+Family = Dict[str, Any]  # {name, type, help, samples: [[sample name, {label: value}, value]]}
+
+
+class Registry:
+    """Collection of metrics owned by one process"""
+
+    def __init__(self):
+        self._metrics: Dict[str, "_Metric"] = {}
+
+    def register(self, metric: "_Metric"):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def get(self, name: str) -> Optional["_Metric"]:
+        return self._metrics.get(name)
+
+    def collect(self, extra_labels: Optional[Dict[str, str]] = None) -> List[Family]:
+        """Snapshot every metric as JSON-ready families, adding `extra_labels` to each sample"""
+        families = []
+        for metric in self._metrics.values():
+            samples = []
+            for sample_name, labels, value in metric.samples():
+                if extra_labels:
+                    labels = {**extra_labels, **labels}
+                samples.append([sample_name, labels, value])
+            families.append({"name": metric.name, "type": metric.type, "help": metric.help, "samples": samples})
+        return families
+
+
+REGISTRY = Registry()
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), registry: Registry = REGISTRY):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        registry.register(self)
+
+    def labels(self, *values):
+        """Get the child for a label combination, creating it on first use"""
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            child = self._children[key] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _label_dict(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def samples(self) -> Iterable[Tuple[str, Dict[str, str], float]]:
+        raise NotImplementedError
+
+
+class _Value:
+    __slots__ = ('value', 'function')
+
+    def __init__(self):
+        self.value = 0.0
+        self.function: Optional[Callable[[], float]] = None
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+    def set_function(self, function: Callable[[], float]):
+        """Read the value from `function` at collection time instead"""
+        self.function = function
+
+    def get(self) -> float:
+        return float(self.function()) if self.function is not None else self.value
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+    type = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1):
+        self.labels().inc(amount)
+
+    def samples(self):
+        for key, child in self._children.items():
+            yield f"{self.name}_total", self._label_dict(key), child.get()
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, or is read from a callback"""
+    type = "gauge"
+
+    def _new_child(self):
+        return _Value()
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+    def inc(self, amount: float = 1):
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1):
+        self.labels().dec(amount)
+
+    def set_function(self, function: Callable[[], float]):
+        self.labels().set_function(function)
+
+    def samples(self):
+        for key, child in self._children.items():
+            try:
+                value = child.get()
+            except Exception:
+                continue  # Callback source has gone away (e.g. closed pool)
+            yield self.name, self._label_dict(key), value
+
+
+class _HistogramValue:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets"""
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS, registry: Registry = REGISTRY):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def time(self):
+        return self.labels().time()
+
+    def samples(self):
+        for key, child in self._children.items():
+            labels = self._label_dict(key)
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), child.counts):
+                cumulative += count
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield f"{self.name}_sum", labels, child.sum
+            yield f"{self.name}_count", labels, child.count
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def merge_families(*family_lists: List[Family]) -> List[Family]:
+    """Combine snapshots from several processes, joining samples of same-named families"""
+    merged: Dict[str, Family] = {}
+    for families in family_lists:
+        for family in families:
+            existing = merged.get(family["name"])
+            if existing is None:
+                merged[family["name"]] = {**family, "samples": list(family["samples"])}
+            else:
+                existing["samples"].extend(family["samples"])
+    return list(merged.values())
+
+
+def render(families: List[Family]) -> str:
+    """Render families in the Prometheus text exposition format (version 0.0.4)"""
+    lines = []
+    for family in families:
+        lines.append(f"# HELP {family['name']} {_escape(family['help'])}")
+        lines.append(f"# TYPE {family['name']} {family['type']}")
+        for sample_name, labels, value in family["samples"]:
+            if labels:
+                label_text = ",".join(f'{key}="{_escape(str(val))}"' for key, val in labels.items())
+                lines.append(f"{sample_name}{{{label_text}}} {_format_value(value)}")
+            else:
+                lines.append(f"{sample_name} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
@@ -0,0 +1,165 @@
+"""
+On-demand profiling of the bot's event loop, triggered over IPC.
+A sampling profiler reads the loop thread's stack from a side thread, so it also catches
+synchronous calls that block the loop; cProfile gives exact call counts at a higher overhead.
+Either mode also reports callbacks that held the loop longer than a threshold, using asyncio's
+debug-mode slow callback logging.
+"""
+
+import asyncio
+import base64
+import cProfile
+import io
+import logging
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+MAX_PROFILE_SECONDS = 120
+# Sampling interval bounds; a zero interval would spin the sampler thread and starve the loop
+MIN_SAMPLE_INTERVAL = 0.001
+MAX_SAMPLE_INTERVAL = 1.0
+# Lower bound on the slow callback threshold, so debug mode doesn't log every callback
+MIN_SLOW_CALLBACK_MS = 1.0
+MODES = ("sample", "cprofile")
+
+_lock = asyncio.Lock()
+
+
+class ProfilerBusyError(Exception):
+    """Raised when a capture is requested while another one is running"""
+
+
+class _SlowCallbackCollector(logging.Handler):
+    """Picks asyncio's "Executing <handle> took N seconds" warnings out of its logger"""
+
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.callbacks: List[Dict[str, Any]] = []
+
+    def emit(self, record: logging.LogRecord):
+        if record.msg == "Executing %s took %.3f seconds" and record.args and len(record.args) == 2:
+            handle, duration = record.args
+            self.callbacks.append({"callback": str(handle), "seconds": round(duration, 4)})
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    path = code.co_filename.replace(os.sep, "/").rsplit("/", 2)
+    return f"{code.co_name} ({'/'.join(path[-2:])}:{code.co_firstlineno})"
+
+
+def _collapse(frame) -> str:
+    """Stack as semicolon-separated frames, outermost first"""
+    stack = []
+    while frame is not None:
+        stack.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(stack))
+
+
+class _StackSampler(threading.Thread):
+    """Samples one thread's stack at a fixed interval"""
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(name="k17-profiler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[_collapse(frame)] += 1
+                self.samples += 1
+            del frame  # Don't keep the loop's frames alive between samples
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+async def capture(seconds: float = 10.0, mode: str = "sample", interval: float = 0.005,
+                  slow_callback_ms: float = 100.0, limit: int = 50, raw: bool = False) -> Dict[str, Any]:
+    """Profile the running event loop for `seconds`
+
+    - sample: collapsed stacks ("frame;frame;frame count" lines, flamegraph.pl/speedscope input)
+    - cprofile: top `limit` functions by cumulative time, plus the base64 marshalled stats when
+      `raw` is set (load with pstats.Stats after writing them to a file)
+
+    Slow callbacks are collected in both modes. Debug mode is switched on for the capture, which
+    adds some overhead of its own; it is restored afterwards.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown profile mode {mode!r}, expected one of {', '.join(MODES)}")
+    if not 0 < seconds <= MAX_PROFILE_SECONDS:
+        raise ValueError(f"Profile duration must be between 0 and {MAX_PROFILE_SECONDS} seconds")
+    if not MIN_SAMPLE_INTERVAL <= interval <= MAX_SAMPLE_INTERVAL:
+        raise ValueError(f"Sampling interval must be between {MIN_SAMPLE_INTERVAL} and {MAX_SAMPLE_INTERVAL} seconds")
+    if not slow_callback_ms >= MIN_SLOW_CALLBACK_MS:
+        raise ValueError(f"Slow callback threshold must be at least {MIN_SLOW_CALLBACK_MS} ms")
+    if limit < 1:
+        raise ValueError("Stats limit must be at least 1")
+    if _lock.locked():
+        raise ProfilerBusyError("A profile is already being captured")
+
+    async with _lock:
+        loop = asyncio.get_running_loop()
+        collector = _SlowCallbackCollector()
+        asyncio_logger = logging.getLogger("asyncio")
+        previous = (loop.get_debug(), loop.slow_callback_duration, asyncio_logger.level)
+
+        sampler: Optional[_StackSampler] = None
+        profiler: Optional[cProfile.Profile] = None
+        asyncio_logger.addHandler(collector)
+        if not asyncio_logger.isEnabledFor(logging.WARNING):
+            asyncio_logger.setLevel(logging.WARNING)
+        loop.slow_callback_duration = slow_callback_ms / 1000
+        loop.set_debug(True)
+
+        started = time.perf_counter()
+        try:
+            if mode == "sample":
+                sampler = _StackSampler(threading.get_ident(), interval)
+                sampler.start()
+            else:
+                profiler = cProfile.Profile()
+                profiler.enable()
+            await asyncio.sleep(seconds)
+        finally:
+            if sampler is not None:
+                sampler.stop()
+            if profiler is not None:
+                profiler.disable()
+            loop.set_debug(previous[0])
+            loop.slow_callback_duration = previous[1]
+            asyncio_logger.setLevel(previous[2])
+            asyncio_logger.removeHandler(collector)
+        elapsed = time.perf_counter() - started
+
+    result: Dict[str, Any] = {
+        "mode": mode,
+        "seconds": round(elapsed, 3),
+        "slow_callback_ms": slow_callback_ms,
+        "slow_callbacks": sorted(collector.callbacks, key=lambda c: c["seconds"], reverse=True)
+    }
+    if sampler is not None:
+        result["interval"] = interval
+        result["samples"] = sampler.samples
+        result["collapsed"] = "\n".join(f"{stack} {count}" for stack, count in sampler.stacks.most_common())
+    else:
+        stats = pstats.Stats(profiler, stream=io.StringIO())
+        stats.sort_stats("cumulative").print_stats(limit)
+        result["stats"] = stats.stream.getvalue()  # type: ignore[attr-defined]
+        if raw:
+            # Same bytes pstats.Stats.dump_stats would write
+            result["pstats"] = base64.b64encode(marshal.dumps(stats.stats)).decode()  # type: ignore[attr-defined]
+    return result